@@ -5,6 +5,23 @@ import os
 from werkzeug.security import generate_password_hash, check_password_hash
 from loguru import logger
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so malformed
+# users files are caught the same way whichever parser is in use.
+try:
+    import orjson  # type: ignore
+
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:
+    # orjson is an optional for speedup, not a requirement
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, indent=4)
+
 
 class User:
     def __init__(
@@ -33,36 +50,50 @@ class User:
         )
 
 
+class FileStorage:
+    """Reads and writes the users JSON document on disk."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
 class AuthManager:
-    def __init__(self, users_file):
+    def __init__(self, users_file, storage=None):
         self.users_file = users_file
+        # Any object with exists()/read()/write(text) works as a backend.
+        self.storage = storage or FileStorage(users_file)
         self.users = self._load_users()
 
     def _load_users(self):
-        if not os.path.exists(self.users_file):
+        if not self.storage.exists():
             logger.info(
                 f"Users file not found. Creating a default '{self.users_file}'..."
             )
             self._create_default_users_file()
 
-        with open(self.users_file, "r") as f:
-            try:
-                users_data = json.load(f)
-                return {
-                    username: User.from_dict(data)
-                    for username, data in users_data.items()
-                }
-            except json.JSONDecodeError:
-                logger.error(
-                    f"Error decoding JSON from {self.users_file}. Creating a new one."
-                )
-                self._create_default_users_file()
-                with open(self.users_file, "r") as f:
-                    users_data = json.load(f)
-                    return {
-                        username: User.from_dict(data)
-                        for username, data in users_data.items()
-                    }
+        try:
+            users_data = _loads(self.storage.read())
+        except json.JSONDecodeError:
+            logger.error(
+                f"Error decoding JSON from {self.users_file}. Creating a new one."
+            )
+            self._create_default_users_file()
+            users_data = _loads(self.storage.read())
+        return {
+            username: User.from_dict(data)
+            for username, data in users_data.items()
+        }
 
     def _create_default_users_file(self):
         default_admin_password = "admin"
@@ -74,22 +105,20 @@ class AuthManager:
                 is_enabled=True,
             ).to_dict()
         }
-        with open(self.users_file, "w") as f:
-            json.dump(default_admin_user, f, indent=4)
+        self.storage.write(_dumps(default_admin_user))
         logger.info(
             f"Default admin user created with password: {default_admin_password}"
         )
 
     def _save_users(self):
-        with open(self.users_file, "w") as f:
-            json.dump(
+        self.storage.write(
+            _dumps(
                 {
                     username: user.to_dict()
                     for username, user in self.users.items()
-                },
-                f,
-                indent=4,
+                }
             )
+        )
 
     def get_user(self, username):
         return self.users.get(username)
@@ -13,6 +13,8 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "bind_port": 5140,
         "debug": False,
         "log_dump": False,
+        "recv_buffer_size": 16777216,
+        "reuse_port": False,
     },
     "database": {
         "driver": "sqlite",  # sqlite is the default driver
@@ -61,7 +63,7 @@ def _create_default_config(path: str) -> Dict[str, Any]:
     return DEFAULT_CONFIG
 
 
-def load_config() -> Dict[str, Any]:
+def load_config(text: str | None = None) -> Dict[str, Any]:
     """
     Loads configuration from a TOML file.
 
@@ -72,7 +74,17 @@ def load_config() -> Dict[str, Any]:
       the server will exit with an error.
     - If the default file ('aiosyslogd.toml') doesn't exist,
       it will be created automatically.
+
+    If `text` is given, it is parsed as the TOML document directly and no
+    file is looked up or created.
     """
+    if text is not None:
+        try:
+            return toml.loads(text)
+        except toml.TomlDecodeError as e:
+            logger.error(f"Error decoding TOML configuration: {e}")
+            raise SystemExit("Aborting due to invalid configuration.")
+
     config_path_from_env: str | None = os.environ.get("AIOSYSLOGD_CONFIG")
 
     if config_path_from_env:
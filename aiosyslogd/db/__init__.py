@@ -1,6 +1,17 @@
 # -*- coding: utf-8 -*-
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
+import sys
+
+try:
+    # A pysqlite3 build linked against a tuned SQLite (see
+    # scripts/build-pysqlite3.sh) replaces the stdlib module, as long as it
+    # is installed before aiosqlite imports sqlite3.
+    import pysqlite3  # type: ignore
+
+    sys.modules["sqlite3"] = pysqlite3
+except ImportError:
+    pass  # pysqlite3 is an optional for speedup, not a requirement
 
 
 class BaseDatabase(ABC):
@@ -5,19 +5,19 @@ import re
 USER_PATTERN = re.compile(
     r"""
     # Match 'user' or 'username' at word boundary
-    \b(user(?:name)?)
+    \b(?P<user_key>user(?:name)?)
     # Match optional equals sign or space
-    (\s*=\s*|\s+)
+    (?P<user_sep>\s*=\s*|\s+)
     (?:
         # Match opening quote (single or double)
-        (["'])
+        (?P<user_quote>["'])
         # Capture content excluding quotes
-        ([^"']*?)
+        (?P<user_quoted>[^"']*?)
         # Match closing quote (same as opening)
-        \3
+        (?P=user_quote)
         |
         # Match unquoted username (no spaces or quotes)
-        ([^\s"']+)
+        (?P<user_bare>[^\s"']+)
     )
     """,
     re.IGNORECASE | re.VERBOSE,
@@ -26,7 +26,12 @@ USER_PATTERN = re.compile(
 # Standard pattern for an IPv4 address
 IPV4_PATTERN = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 
-# Simplified pattern for IPv6, assuming IPv4 is redacted first
+# IPv4-mapped IPv6 address, e.g. ::ffff:192.0.2.128, redacted as one unit
+IPV4_MAPPED_PATTERN = re.compile(
+    r"::ffff:" + IPV4_PATTERN.pattern, re.IGNORECASE
+)
+
+# Simplified pattern for IPv6 (IPv4-mapped addresses are matched above)
 IPV6_PATTERN = re.compile(
     r"""
     (?:
@@ -57,9 +62,6 @@ IPV6_PATTERN = re.compile(
         \b
         fe80:(?::[0-9a-fA-F]{0,4}){0,4}%[0-9a-zA-Z]+
         \b
-        |
-        # IPv4-mapped: ::ffff: with redacted IPv4
-        ::ffff:█+
     )
     """,
     re.IGNORECASE | re.VERBOSE,
@@ -75,19 +77,24 @@ MAC_PATTERN = re.compile(
     r"\b(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}\b", re.IGNORECASE
 )
 
-# --- Performance Enhancement: Combined Pattern ---
-# Combine simple patterns (IPv4, MAC, IPv6 Loopback) into one for a single pass.
-# The main IPv6 pattern is kept separate because it has a dependency on the
-# IPv4 redaction for mapped addresses.
-COMBINED_SIMPLE_REDACTION_PATTERN = re.compile(
+# --- Combined Pattern ---
+# All patterns are joined into one alternation so redact() scans a message
+# once. Where two alternatives can start at the same position, the earlier
+# one wins: usernames first, then IPv4-mapped IPv6 ahead of plain IPv4, and
+# the general IPv6 pattern last.
+REDACTION_PATTERN = re.compile(
     "|".join(
-        [
-            IPV4_PATTERN.pattern,
-            MAC_PATTERN.pattern,
-            IPV6_LOOPBACK_PATTERN.pattern,
-        ]
+        f"(?:{pattern.pattern}\n)"
+        for pattern in (
+            USER_PATTERN,
+            IPV4_MAPPED_PATTERN,
+            IPV4_PATTERN,
+            MAC_PATTERN,
+            IPV6_LOOPBACK_PATTERN,
+            IPV6_PATTERN,
+        )
     ),
-    re.IGNORECASE,
+    re.IGNORECASE | re.VERBOSE,
 )
 
 
@@ -107,39 +114,28 @@ def redact(message: str, fancy_redaction_char: str | None = None) -> str:
     Returns:
         A new string with sensitive information replaced by '█' or a fancy character.
     """
-
-    # --- Redaction Logic ---
-    def user_replacer(match: re.Match) -> str:
-        """Replaces matched usernames with redacted version."""
-        prefix = f"{match.group(1)}{match.group(2)}"
-        if match.group(4) is not None:
-            quote = match.group(3)
-            value = match.group(4)
-            return f"{prefix}{quote}{REDACTION_CHAR * len(value)}{quote}"
-        value = match.group(5)
-        return f"{prefix}{REDACTION_CHAR * len(value)}"
-
-    def simple_block_replacer(match: re.Match) -> str:
-        """Replaces blocked patterns with redacted characters."""
-        return REDACTION_CHAR * len(match.group(0))
-
-    # --- Optimized Redaction Order ---
-    # Pass 1: Redact simple, non-dependent patterns (IPv4, MAC, IPv6 Loopback).
-    redacted_message = COMBINED_SIMPLE_REDACTION_PATTERN.sub(
-        simple_block_replacer, message
-    )
-
-    # Pass 2: Redact the more complex IPv6 patterns, which may depend on the first pass
-    # (e.g., for IPv4-mapped addresses).
-    redacted_message = IPV6_PATTERN.sub(simple_block_replacer, redacted_message)
-
-    # Pass 3: Redact usernames, which has its own replacement logic.
-    redacted_message = USER_PATTERN.sub(user_replacer, redacted_message)
-
-    # Replace the redaction character if a fancy one is provided (e.g. "▒").
-    if fancy_redaction_char:
-        redacted_message = redacted_message.replace(
-            REDACTION_CHAR, fancy_redaction_char
-        )
-
-    return redacted_message
+    # Every alternative needs a '.', ':' or '-' (addresses) or the word
+    # "user", so lines with none of them can skip the regex engine. casefold()
+    # mirrors IGNORECASE, which also folds characters like 'ſ' to 's'.
+    if (
+        "." not in message
+        and ":" not in message
+        and "-" not in message
+        and "user" not in message.casefold()
+    ):
+        return message
+
+    char = fancy_redaction_char or REDACTION_CHAR
+
+    def replacer(match: re.Match) -> str:
+        """Redacts a match, keeping the key and quotes of a username."""
+        if match.group("user_key") is None:
+            return char * len(match.group(0))
+        prefix = f"{match.group('user_key')}{match.group('user_sep')}"
+        value = match.group("user_quoted")
+        if value is not None:
+            quote = match.group("user_quote")
+            return f"{prefix}{quote}{char * len(value)}{quote}"
+        return f"{prefix}{char * len(match.group('user_bare'))}"
+
+    return REDACTION_PATTERN.sub(replacer, message)
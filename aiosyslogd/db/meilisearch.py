@@ -7,12 +7,23 @@ from meilisearch_python_sdk.errors import (
     MeilisearchApiError,
     MeilisearchCommunicationError,
 )
+from meilisearch_python_sdk.json_handler import BuiltinHandler, OrjsonHandler
 from meilisearch_python_sdk.models.settings import (
     MeilisearchSettings,
     ProximityPrecision,
 )
 from typing import Any, Dict, List, Set
 import asyncio
+import itertools
+
+# The SDK serializes every add_documents payload; orjson does it much faster.
+try:
+    import orjson  # type: ignore  # noqa: F401
+
+    JsonHandler: type[BuiltinHandler] | type[OrjsonHandler] = OrjsonHandler
+except ImportError:
+    # orjson is an optional for speedup, not a requirement
+    JsonHandler = BuiltinHandler
 
 
 class MeilisearchDriver(BaseDatabase):
@@ -25,9 +36,14 @@ class MeilisearchDriver(BaseDatabase):
         self.client = AsyncClient(
             url=self.config.get("url", "http://127.0.0.1:7700"),
             api_key=self.config.get("api_key") or None,
+            json_handler=JsonHandler(),
         )
         self._indexes_created: Set[str] = set()
         self._index_locks: Dict[str, asyncio.Lock] = {}
+        # Per-driver sequence that keeps IDs unique for equal timestamps;
+        # the worker prefix keeps them unique across --workers processes.
+        self._doc_ids = itertools.count()
+        self._worker_id = config.get("worker_id", 0)
 
     async def connect(self) -> None:
         """Checks the connection to the Meilisearch instance."""
@@ -106,20 +122,31 @@ class MeilisearchDriver(BaseDatabase):
             self._indexes_created.add(index_name)
             logger.debug(f"Index '{index_name}' is ready.")
 
+    async def _add_documents(
+        self, index_name: str, docs: List[Dict[str, Any]]
+    ) -> int:
+        """Sends documents to a monthly index and returns the task uid."""
+        await self._ensure_monthly_index(index_name)
+        doc_add_task = await self.client.index(index_name).add_documents(docs)
+        return doc_add_task.task_uid
+
     async def write_batch(self, batch: List[Dict[str, Any]]) -> None:
         """Writes a batch of log documents to Meilisearch."""
         if not batch:
             return
 
         batches_by_index: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for i, msg in enumerate(batch):
-            index_name = msg["ReceivedAt"].strftime("SystemEvents%Y%m")
+        for msg in batch:
+            received_at = msg["ReceivedAt"]
+            index_name = (
+                f"SystemEvents{received_at.year}{received_at.month:02d}"
+            )
 
             # Meilisearch needs a unique ID for each document.
             # ID must be alphanumeric, no periods allowed.
             doc = msg.copy()
-            doc_id_ts = str(msg["ReceivedAt"].timestamp()).replace(".", "")
-            doc["id"] = f"{doc_id_ts}-{i}"
+            doc_id_us = int(received_at.timestamp() * 1_000_000)
+            doc["id"] = f"{doc_id_us}-{self._worker_id}-{next(self._doc_ids)}"
 
             # Convert datetime objects to strings for JSON serialization
             doc["ReceivedAt"] = msg["ReceivedAt"].isoformat()
@@ -128,13 +155,14 @@ class MeilisearchDriver(BaseDatabase):
             batches_by_index[index_name].append(doc)
 
         try:
-            # Step 1: Send all documents and collect the task uids
-            tasks_to_wait: List[int] = []
-            for index_name, docs in batches_by_index.items():
-                await self._ensure_monthly_index(index_name)
-                index = self.client.index(index_name)
-                doc_add_task = await index.add_documents(docs)
-                tasks_to_wait.append(doc_add_task.task_uid)
+            # Step 1: Send each index's documents concurrently and collect
+            # the task uids, so a month-boundary batch costs one round-trip.
+            tasks_to_wait: List[int] = await asyncio.gather(
+                *(
+                    self._add_documents(index_name, docs)
+                    for index_name, docs in batches_by_index.items()
+                )
+            )
 
             # Step 2: Wait for Meilisearch to confirm all tasks have been processed
             if tasks_to_wait:
@@ -1,18 +1,53 @@
 # -*- coding: utf-8 -*-
 from . import BaseDatabase
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
-import aiosqlite
+from typing import Any, Callable, Dict, List, TypeVar
+import asyncio
 import glob
 import operator
 import os
+import sqlite3
 from loguru import logger
 
+# Every monthly database file holds a single "SystemEvents" table, so the
+# INSERT statement is identical for all writes. Building it once lets
+# sqlite3's statement cache reuse the prepared statement across batches.
+INSERT_COLUMNS = (
+    "Facility",
+    "Priority",
+    "FromHost",
+    "InfoUnitID",
+    "ReceivedAt",
+    "DeviceReportedTime",
+    "SysLogTag",
+    "ProcessID",
+    "Message",
+)
+INSERT_SQL = (
+    f'INSERT INTO "SystemEvents" ({", ".join(INSERT_COLUMNS)}) '
+    f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})"
+)
+# Positional parameters bind faster than named ones, which sqlite3 has to
+# look up in each row dict; itemgetter pulls the values out in C.
+_ROW_VALUES = operator.itemgetter(*INSERT_COLUMNS)
+
+T = TypeVar("T")
+
 
 class SQLiteDriver(BaseDatabase):
     """
     SQLite database driver that creates a new database file for each month.
     Optimized to handle month-boundary batches efficiently.
+
+    Each month's file has its own WAL and page cache, so inserts only touch
+    the small current-month file no matter how much history accumulates,
+    and retention is a matter of deleting whole files.
+
+    The connection is a plain sqlite3 one owned by a single writer thread.
+    Each sub-batch is handed over as one unit (executemany + commit), so
+    a write costs one thread hop instead of one per statement.
     """
 
     def __init__(self, config: Dict[str, Any]):
@@ -21,9 +56,19 @@ class SQLiteDriver(BaseDatabase):
         self.sql_dump = config.get("sql_dump", False)
         self.debug = config.get("debug", False)
         self.retention_months = config.get("retention_months", 12)
-        self.db: aiosqlite.Connection | None = None
+        # With --workers, every process writes the same monthly files;
+        # only worker 0 deletes old ones so the workers don't race.
+        self.worker_id = config.get("worker_id", 0)
+        self.db: sqlite3.Connection | None = None
         self._current_db_path: str | None = None
-        pass
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-writer"
+        )
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Runs a blocking call on the writer thread that owns the connection."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, func, *args)
 
     def _get_db_path_for_month(self, dt: datetime) -> str:
         """Generates a monthly database filename, e.g., syslog_202506.sqlite3"""
@@ -38,14 +83,23 @@ class SQLiteDriver(BaseDatabase):
         await self.cleanup_old_databases()
 
     async def close(self) -> None:
+        """Closes the database connection and stops the writer thread."""
+        try:
+            await self._close_connection()
+        finally:
+            self._writer.shutdown(wait=True)
+
+    async def _close_connection(self) -> None:
         """Closes the current database connection if it exists."""
         if self.db:
-            await self.db.close()
-            logger.debug(
-                f"SQLite connection to '{self._current_db_path}' closed."
-            )
-            self.db = None
-            self._current_db_path = None
+            try:
+                await self._run(self._close_db, self.db)
+                logger.debug(
+                    f"SQLite connection to '{self._current_db_path}' closed."
+                )
+            finally:
+                self.db = None
+                self._current_db_path = None
 
     def _get_database_files(self) -> List[tuple[str, datetime]]:
         """Returns a list of (filepath, month_datetime) tuples for existing database files."""
@@ -69,6 +123,8 @@ class SQLiteDriver(BaseDatabase):
 
     async def cleanup_old_databases(self) -> None:
         """Deletes old database files, keeping only the most recent retention_months monthly files."""
+        if self.worker_id != 0:
+            return
         db_files = self._get_database_files()
         if self.retention_months <= 0:
             to_delete = db_files
@@ -113,7 +169,7 @@ class SQLiteDriver(BaseDatabase):
         target_db_path = self._get_db_path_for_month(dt)
         if target_db_path != self._current_db_path:
             if self.db:
-                await self.close()
+                await self._close_connection()
 
             logger.info(
                 f"Month changed. Switching connection to '{target_db_path}'..."
@@ -121,66 +177,75 @@ class SQLiteDriver(BaseDatabase):
             # Clean up old databases before switching to the new one
             await self.cleanup_old_databases()
 
-            self.db = await aiosqlite.connect(target_db_path)
-            await self.db.execute("PRAGMA journal_mode=WAL;")
-            await self.db.commit()
+            self.db = await self._run(self._open_db, target_db_path)
             self._current_db_path = target_db_path
             logger.info(f"Successfully connected to '{target_db_path}'.")
             await self.create_monthly_table("SystemEvents")
 
     async def create_monthly_table(self, table_name: str) -> None:
         """Creates tables for the given month if they don't exist."""
-        fts_table_name = f"{table_name}_FTS"
         if not self.db:
             raise ConnectionError("Database is not connected.")
-        async with self.db.cursor() as cursor:
-            await cursor.execute(
+        await self._run(self._create_tables, self.db, table_name)
+
+    def _create_tables(self, db: sqlite3.Connection, table_name: str) -> None:
+        """Creates the table, indexes and FTS5 sync triggers on the writer thread."""
+        fts_table_name = f"{table_name}_FTS"
+        # With --workers, several processes may open a new month's file at
+        # once; the write lock makes check-and-create atomic, and IF NOT
+        # EXISTS keeps each statement safe on its own.
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = db.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
                 (table_name,),
             )
-            if await cursor.fetchone() is None:
+            if cursor.fetchone() is None:
                 logger.debug(
                     f"Creating new tables and indexes in {self._current_db_path}: "
                     f"{table_name}, {fts_table_name}"
                 )
-                await self.db.execute(f"""CREATE TABLE \"{table_name}\" (
+                db.execute(f"""CREATE TABLE IF NOT EXISTS \"{table_name}\" (
                     ID INTEGER PRIMARY KEY AUTOINCREMENT, Facility INTEGER,
                     Priority INTEGER, FromHost TEXT, InfoUnitID INTEGER,
                     ReceivedAt TIMESTAMP, DeviceReportedTime TIMESTAMP,
                     SysLogTag TEXT, ProcessID TEXT, Message TEXT)""")
-                await self.db.execute(
-                    f'CREATE INDEX "idx_{table_name}_ReceivedAt" ON "{table_name}" (ReceivedAt)'
+                db.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_ReceivedAt" ON "{table_name}" (ReceivedAt)'
                 )
-                await self.db.execute(
-                    f'CREATE INDEX "idx_{table_name}_FromHost" ON "{table_name}" (FromHost)'
+                db.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_FromHost" ON "{table_name}" (FromHost)'
                 )
-                await self.db.execute(
-                    f"""CREATE VIRTUAL TABLE "{fts_table_name}"
+                db.execute(
+                    f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{fts_table_name}"
                     USING fts5(Message, content="{table_name}", content_rowid="ID")"""
                 )
-                await self.db.execute(
-                    f"""CREATE TRIGGER \"{table_name}_insert\" AFTER INSERT ON \"{table_name}\"
+                db.execute(
+                    f"""CREATE TRIGGER IF NOT EXISTS \"{table_name}_insert\" AFTER INSERT ON \"{table_name}\"
                     BEGIN
                         INSERT INTO \"{fts_table_name}\"(rowid, Message)
                         VALUES (new.ID, new.Message);
                     END"""
                 )
-                await self.db.execute(
-                    f"""CREATE TRIGGER \"{table_name}_update\" AFTER UPDATE ON \"{table_name}\"
+                db.execute(
+                    f"""CREATE TRIGGER IF NOT EXISTS \"{table_name}_update\" AFTER UPDATE ON \"{table_name}\"
                     BEGIN
                         UPDATE \"{fts_table_name}\"
                         SET Message = new.Message
                         WHERE rowid = new.ID;
                     END"""
                 )
-                await self.db.execute(
-                    f"""CREATE TRIGGER \"{table_name}_delete\" AFTER DELETE ON \"{table_name}\"
+                db.execute(
+                    f"""CREATE TRIGGER IF NOT EXISTS \"{table_name}_delete\" AFTER DELETE ON \"{table_name}\"
                     BEGIN
                         DELETE FROM \"{fts_table_name}\"
                         WHERE rowid = old.ID;
                     END"""
                 )
-                await self.db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
 
     # Private helper method to handle writing a homogenous (single-month) batch.
     async def _write_sub_batch(self, sub_batch: List[Dict[str, Any]]):
@@ -191,17 +256,9 @@ class SQLiteDriver(BaseDatabase):
                 logger.error("DB connection failed. Skipping sub-batch.")
                 return
 
-            table_name = "SystemEvents"
-            sql_command = (
-                f'INSERT INTO "{table_name}" (Facility, Priority, FromHost, InfoUnitID, '
-                "ReceivedAt, DeviceReportedTime, SysLogTag, ProcessID, Message) "
-                "VALUES (:Facility, :Priority, :FromHost, :InfoUnitID, :ReceivedAt, "
-                ":DeviceReportedTime, :SysLogTag, :ProcessID, :Message)"
-            )
-            await self.db.executemany(sql_command, sub_batch)
-            await self.db.commit()
+            await self._run(self._insert_rows, self.db, sub_batch)
             if self.sql_dump:
-                logger.trace(f"SQL: {sql_command}")
+                logger.trace(f"SQL: {INSERT_SQL}")
                 logger.trace(f"PARAMS: {sub_batch[0]}")
                 if len(sub_batch) > 1:
                     logger.trace(f"(...and {len(sub_batch) - 1} more logs...)")
@@ -209,16 +266,56 @@ class SQLiteDriver(BaseDatabase):
             logger.debug(
                 f"Successfully wrote {len(sub_batch)} logs to '{self._current_db_path}'."
             )
-        except aiosqlite.Error as e:
+        except sqlite3.Error as e:
             logger.opt(exception=True).error(f"Batch SQL write failed: {e}")
             if self.db:
-                await self.db.rollback()
+                await self._run(self.db.rollback)
         except Exception as e:
             logger.opt(exception=True).error(
                 f"An unexpected error occurred during batch write: {e}"
             )
             if self.db:
-                await self.db.rollback()
+                await self._run(self.db.rollback)
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        """Opens a monthly database file in WAL mode on the writer thread."""
+        db = sqlite3.connect(path)
+        # PRAGMAs run outside a transaction; no commit needed.
+        # With --workers, several processes write this file; wait for the
+        # write lock instead of failing the batch with SQLITE_BUSY. Set it
+        # first, since switching to WAL needs the lock too.
+        db.execute("PRAGMA busy_timeout=10000;")
+        db.execute("PRAGMA journal_mode=WAL;")
+        # In WAL mode NORMAL only syncs at checkpoints, not on every batch
+        # commit; the database stays consistent, a crash can only drop the
+        # last few batches.
+        db.execute("PRAGMA synchronous=NORMAL;")
+        # A 64 MiB page cache keeps the FTS index pages of the current month
+        # hot across batches.
+        db.execute("PRAGMA cache_size=-64000;")
+        return db
+
+    @staticmethod
+    def _close_db(db: sqlite3.Connection) -> None:
+        """Refreshes planner statistics and closes the connection."""
+        # The writer connection only inserts, so ask optimize to check every
+        # table (0x10000) rather than just those this connection queried.
+        # Newer SQLite bounds the ANALYZE work; older versions skip it.
+        try:
+            db.execute("PRAGMA optimize=0x10002;")
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA optimize failed before close: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _insert_rows(
+        db: sqlite3.Connection, rows: List[Dict[str, Any]]
+    ) -> None:
+        """Inserts and commits a sub-batch in a single transaction."""
+        db.executemany(INSERT_SQL, map(_ROW_VALUES, rows))
+        db.commit()
 
     # The optimized write_batch method with a fast path.
     async def write_batch(self, batch: List[Dict[str, Any]]) -> None:
@@ -244,11 +341,13 @@ class SQLiteDriver(BaseDatabase):
             # --- SLOW PATH (Rare month-boundary case) ---
             # Partition the batch by month and write each sub-batch.
             logger.debug("Month boundary detected in batch, partitioning...")
-            batches_by_month: Dict[str, List[Dict[str, Any]]] = {}
+            # An integer year * 100 + month key avoids a strftime() per log.
+            batches_by_month: Dict[int, List[Dict[str, Any]]] = defaultdict(
+                list
+            )
             for msg in batch:
-                month_key = msg["ReceivedAt"].strftime("%Y%m")
-                if month_key not in batches_by_month:
-                    batches_by_month[month_key] = []
+                received_at = msg["ReceivedAt"]
+                month_key = received_at.year * 100 + received_at.month
                 batches_by_month[month_key].append(msg)
 
             for month_batch in batches_by_month.values():
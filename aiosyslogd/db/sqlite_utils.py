@@ -1,9 +1,11 @@
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from loguru import logger as _logger
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, List, Tuple
 import aiosqlite
 import asyncio
+import functools
 import glob
 import os
 import sqlite3
@@ -12,6 +14,35 @@ import time
 
 
 # --- Helper Functions ---
+def _dir_stamp(directory: str) -> int | None:
+    """
+    Returns the directory's mtime in nanoseconds, used as a cache key for
+    its listing. Adding or deleting a monthly file changes it. Returns None
+    if the directory changed within the last second, since another change
+    in the same filesystem timestamp tick would not move the mtime.
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    if time.time_ns() - mtime_ns < 1_000_000_000:
+        return None
+    return mtime_ns
+
+
+def _find_databases(search_pattern: str) -> Tuple[str, ...]:
+    """Globs for the monthly database files, newest month first."""
+    return tuple(sorted(glob.glob(search_pattern), reverse=True))
+
+
+@functools.lru_cache(maxsize=4)
+def _get_available_databases_cached(
+    search_pattern: str, dir_stamp: int
+) -> Tuple[str, ...]:
+    """Caches _find_databases() per directory mtime."""
+    return _find_databases(search_pattern)
+
+
 async def get_available_databases(cfg: Dict) -> List[str]:
     """Finds available monthly SQLite database files."""
     db_template: str = (
@@ -21,11 +52,16 @@ async def get_available_databases(cfg: Dict) -> List[str]:
     )
     base, ext = os.path.splitext(db_template)
     search_pattern: str = f"{base}_*{ext}"
+    dir_stamp = _dir_stamp(os.path.dirname(search_pattern) or ".")
     # In case that there are a lot of files,
     # we use asyncio.to_thread to avoid blocking the event loop.
-    files: List[str] = await asyncio.to_thread(glob.glob, search_pattern)
-    files.sort(reverse=True)
-    return files
+    if dir_stamp is None:
+        files = await asyncio.to_thread(_find_databases, search_pattern)
+    else:
+        files = await asyncio.to_thread(
+            _get_available_databases_cached, search_pattern, dir_stamp
+        )
+    return list(files)
 
 
 async def get_time_boundary_ids(
@@ -269,6 +305,65 @@ class QueryContext:
     page_size: int
 
 
+# --- Read Connection Pool ---
+class ReadOnlyConnectionPool:
+    """
+    Keeps read-only connections to the monthly databases open between
+    queries, so a page view skips the connect and starts with a warm page
+    cache. At most max_idle connections stay open; the least recently used
+    one is closed first.
+    """
+
+    def __init__(self, max_idle: int = 4, mmap_size: int = 1 << 30):
+        """Initializes an empty pool."""
+        self.max_idle = max_idle
+        self.mmap_size = mmap_size
+        self._idle: List[Tuple[str, aiosqlite.Connection]] = []
+
+    @asynccontextmanager
+    async def acquire(
+        self, db_path: str
+    ) -> AsyncIterator[aiosqlite.Connection]:
+        """Lends out a connection to db_path, opening one if none is idle."""
+        conn = self._take_idle(db_path)
+        if conn is None:
+            conn = await aiosqlite.connect(
+                f"file:{db_path}?mode=ro",
+                uri=True,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            )
+            # Read pages straight from the OS page cache instead of one
+            # pread() per page; the mapping is shared, not process memory.
+            async with conn.execute(f"PRAGMA mmap_size={self.mmap_size}"):
+                pass
+        try:
+            yield conn
+        except BaseException:
+            # The connection may be in a bad state; don't hand it out again.
+            await conn.close()
+            raise
+        self._idle.append((db_path, conn))
+        while len(self._idle) > self.max_idle:
+            _, oldest = self._idle.pop(0)
+            await oldest.close()
+
+    def _take_idle(self, db_path: str) -> aiosqlite.Connection | None:
+        """Removes and returns the most recently used idle connection to db_path."""
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i][0] == db_path:
+                return self._idle.pop(i)[1]
+        return None
+
+    async def close(self) -> None:
+        """Closes all idle connections."""
+        while self._idle:
+            _, conn = self._idle.pop()
+            await conn.close()
+
+
+read_pool = ReadOnlyConnectionPool()
+
+
 # --- Core Logic in a Dedicated Class ---
 class LogQuery:
     """Handles the logic for fetching and paginating logs from the database."""
@@ -307,12 +402,7 @@ class LogQuery:
     async def run(self) -> Dict[str, Any]:
         """Executes the full query process and returns the results."""
         try:
-            db_uri: str = f"file:{self.ctx.db_path}?mode=ro"
-            async with aiosqlite.connect(
-                db_uri,
-                uri=True,
-                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-            ) as conn:
+            async with read_pool.acquire(self.ctx.db_path) as conn:
                 self.conn = conn
                 self.conn.row_factory = aiosqlite.Row
 
@@ -44,29 +44,36 @@ class SyslogMatrix:
 
     def __init__(self) -> None:
         """Initializes the SyslogMatrix with a mapping of priority codes."""
-        # Create a mapping of syslog priority codes to (facility, level) tuples
-        # using a dictionary comprehension for efficient lookups and clean code.
-        self.matrix: Dict[str, Tuple[str, str]] = {
-            str(i): (facility, level)
-            for i, (facility, level) in enumerate(
-                (f, lvl) for f in self.FACILITIES for lvl in self.LEVELS
-            )
-        }
+        # The tables are built once at import and shared by every instance.
+        self.matrix: Dict[str, Tuple[str, str]] = _MATRIX
 
     def decode(
         self, code: str | int
     ) -> Tuple[Tuple[str, int], Tuple[str, int]]:
         """Decodes a syslog priority code into facility and level tuples."""
-        str_code: str = str(code)
-        facility_str, level_str = self.matrix.get(
-            str_code, ("kernel", "emergency")
-        )  # Fallback to 0, 0
-        return (
-            (facility_str, self.FACILITIES.index(facility_str)),
-            (level_str, self.LEVELS.index(level_str)),
-        )
+        # Fallback to 0, 0 (kernel, emergency) for unknown codes.
+        return _DECODE_TABLE.get(str(code), _DECODE_TABLE["0"])
 
     def decode_int(self, code: str | int) -> Tuple[int, int]:
         """Decodes a syslog priority code into facility and level integer indices."""
-        facility, level = self.decode(code)
-        return (facility[1], level[1])
+        return _DECODE_INT_TABLE.get(str(code), (0, 0))
+
+
+# All 192 valid priority codes (24 facilities x 8 levels), keyed by their
+# string form as it appears between the angle brackets of a message.
+_MATRIX: Dict[str, Tuple[str, str]] = {
+    str(i): (facility, level)
+    for i, (facility, level) in enumerate(
+        (f, lvl)
+        for f in SyslogMatrix.FACILITIES
+        for lvl in SyslogMatrix.LEVELS
+    )
+}
+_DECODE_TABLE: Dict[str, Tuple[Tuple[str, int], Tuple[str, int]]] = {
+    str(i): ((facility, i >> 3), (level, i & 7))
+    for i, (facility, level) in enumerate(_MATRIX.values())
+}
+_DECODE_INT_TABLE: Dict[str, Tuple[int, int]] = {
+    code: (facility[1], level[1])
+    for code, (facility, level) in _DECODE_TABLE.items()
+}
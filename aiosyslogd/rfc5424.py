@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime, UTC
+from functools import lru_cache
 from typing import Dict
 import re
 from loguru import logger
@@ -32,9 +33,6 @@ RFC3164_PATTERN: re.Pattern[str] = re.compile(
     re.DOTALL,
 )
 
-# Pattern to extract PID from the tag, if present.
-PID_PATTERN: re.Pattern[str] = re.compile(r"^(.*)\[(\d+)\]$")
-
 # --- Month Abbreviation to Number Mapping ---
 MONTH_MAP = {
     "Jan": 1,
@@ -52,6 +50,22 @@ MONTH_MAP = {
 }
 
 
+def _utc_timestamp(dt: datetime) -> str:
+    """Formats a UTC datetime as an RFC 5424 timestamp with milliseconds."""
+    # isoformat ends in "+00:00" for UTC; swap it for "Z".
+    return dt.isoformat(timespec="milliseconds")[:-6] + "Z"
+
+
+@lru_cache(maxsize=4096)
+def _local_to_utc_timestamp(dt_naive: datetime) -> str:
+    """
+    Converts a naive local time to an RFC 5424 UTC timestamp.
+    RFC 3164 headers have one-second resolution, so a busy stream keeps
+    repeating the same few values; caching skips the zone conversion.
+    """
+    return _utc_timestamp(dt_naive.astimezone(UTC))
+
+
 def convert_rfc3164_to_rfc5424(message: str, debug_mode: bool = False) -> str:
     """
     Converts a best-effort RFC 3164 syslog message to an RFC 5424 message.
@@ -72,12 +86,12 @@ def convert_rfc3164_to_rfc5424(message: str, debug_mode: bool = False) -> str:
     raw_tag: str = parts["tag"]
     msg: str = parts["msg"].strip()
 
+    # Split a trailing "[PID]" off the tag, e.g. "CRON[12345]".
     app_name: str = raw_tag
     procid: str = "-"
-    pid_match: re.Match[str] | None = PID_PATTERN.match(raw_tag)
-    if pid_match:
-        app_name = pid_match.group(1)
-        procid = pid_match.group(2)
+    head, bracket, tail = raw_tag.rpartition("[")
+    if bracket and tail[-1:] == "]" and tail[:-1].isdecimal():
+        app_name, procid = head, tail[:-1]
 
     try:
         now = datetime.now()
@@ -92,16 +106,14 @@ def convert_rfc3164_to_rfc5424(message: str, debug_mode: bool = False) -> str:
         if dt_naive > now:
             dt_naive = dt_naive.replace(year=now.year - 1)
 
-        dt_aware: datetime = dt_naive.astimezone().astimezone(UTC)
-        timestamp: str = dt_aware.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        # A naive value is taken as local time and converted in one step.
+        timestamp: str = _local_to_utc_timestamp(dt_naive)
     except (ValueError, KeyError):
         if debug_mode:
             logger.debug(
                 "Could not parse RFC-3164 timestamp, using current time."
             )
-        timestamp = (
-            datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
-        )
+        timestamp = _utc_timestamp(datetime.now(UTC))
 
     return f"<{priority}>1 {timestamp} {hostname} {app_name} {procid} - - {msg}"
 
@@ -6,14 +6,18 @@ from . import config
 from .db import BaseDatabase
 from .priority import SyslogMatrix
 from .rfc5424 import RFC5424_PATTERN, normalize_to_rfc5424
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 from importlib import import_module
 from loguru import logger
 from types import ModuleType
 from typing import Dict, Any, Tuple, List, Type, Self
+import argparse
 import asyncio
+import multiprocessing
 import re
 import signal
+import socket
 import sys
 
 uvloop: ModuleType | None = None
@@ -34,6 +38,10 @@ DEBUG: bool = SERVER_CFG.get("debug", False)
 LOG_DUMP: bool = SERVER_CFG.get("log_dump", False)
 BINDING_IP: str = SERVER_CFG.get("bind_ip", "0.0.0.0")
 BINDING_PORT: int = int(SERVER_CFG.get("bind_port", 5140))
+# Kernel receive buffer for the UDP socket; absorbs bursts while the
+# event loop is busy. The kernel may clamp it to net.core.rmem_max.
+RECV_BUFFER_SIZE: int = int(SERVER_CFG.get("recv_buffer_size", 16777216))
+REUSE_PORT: bool = SERVER_CFG.get("reuse_port", False)
 
 # Database settings
 DB_CFG = CFG.get("database", {})
@@ -43,26 +51,36 @@ BATCH_TIMEOUT: int = int(DB_CFG.get("batch_timeout", 5))
 # SQL_DUMP is now driver-specific, check SQLite config for backward compatibility
 SQL_DUMP: bool = DB_CFG.get("sqlite", {}).get("sql_dump", False)
 
+# How often (in seconds) the monotonic-to-wall-clock anchor is refreshed so
+# that ReceivedAt follows wall-clock adjustments (e.g. NTP) without drifting.
+CLOCK_REANCHOR_INTERVAL: float = 60.0
+
 
 # --- Security: Define an allowlist of valid database drivers ---
-ALLOWED_DB_DRIVERS = {"sqlite", "meilisearch"}
+ALLOWED_DB_DRIVERS = frozenset({"sqlite", "meilisearch"})
+
 
+def get_db_driver(worker_id: int = 0) -> BaseDatabase | None:
+    """Dynamically imports and returns a database driver instance.
 
-def get_db_driver() -> BaseDatabase | None:
-    """Dynamically imports and returns a database driver instance."""
+    worker_id tells the driver which --workers process it runs in; 0 is the
+    only process in single-process mode.
+    """
     # --- SECURITY MITIGATION ---
     # Validate the driver name against the allowlist to prevent code injection.
     if DB_DRIVER not in ALLOWED_DB_DRIVERS:
         logger.error(
             f"Invalid database driver '{DB_DRIVER}' specified in configuration."
         )
-        logger.error(f"Allowed drivers are: {', '.join(ALLOWED_DB_DRIVERS)}")
+        logger.error(
+            f"Allowed drivers are: {', '.join(sorted(ALLOWED_DB_DRIVERS))}"
+        )
         raise SystemExit("Aborting due to invalid database driver.")
     # --- END SECURITY MITIGATION ---
     try:
         driver_module = import_module(f".db.{DB_DRIVER}", package="aiosyslogd")
         driver_class = getattr(driver_module, f"{DB_DRIVER.capitalize()}Driver")
-        driver_config = DB_CFG.get(DB_DRIVER, {})
+        driver_config = {**DB_CFG.get(DB_DRIVER, {}), "worker_id": worker_id}
         return driver_class(driver_config)
     except (ImportError, AttributeError) as e:
         logger.opt(exception=True).error(
@@ -72,6 +90,42 @@ def get_db_driver() -> BaseDatabase | None:
         raise SystemExit("Aborting due to invalid database driver.")
 
 
+def create_udp_socket(
+    host: str, port: int, reuse_port: bool = False
+) -> socket.socket:
+    """Creates a non-blocking UDP socket bound to host:port.
+
+    The socket is created up front instead of letting asyncio do it so that
+    a large SO_RCVBUF and, optionally, SO_REUSEPORT can be set before bind.
+    """
+    family, _, _, _, sockaddr = socket.getaddrinfo(
+        host, port, type=socket.SOCK_DGRAM
+    )[0]
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    try:
+        if reuse_port or REUSE_PORT:
+            if hasattr(socket, "SO_REUSEPORT"):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            else:
+                logger.warning(
+                    "SO_REUSEPORT is not supported on this platform."
+                )
+        if RECV_BUFFER_SIZE > 0:
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE
+            )
+        sock.bind(sockaddr)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    logger.debug(
+        "UDP receive buffer: "
+        f"{sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes"
+    )
+    return sock
+
+
 class SyslogUDPServer(asyncio.DatagramProtocol):
     """An asynchronous Syslog UDP server with pluggable DB drivers."""
 
@@ -88,14 +142,26 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
         self.transport: asyncio.DatagramTransport | None = None
         self._shutting_down: bool = False
         self._db_writer_task: asyncio.Task[None] | None = None
-        self._message_queue: asyncio.Queue[
-            Tuple[bytes, Tuple[str, int], datetime]
-        ] = asyncio.Queue()
+        # A single producer (datagram_received) and a single consumer
+        # (database_writer) share one loop, so a plain deque plus an Event
+        # is enough; asyncio.Queue's per-item future bookkeeping isn't needed.
+        self._message_queue: deque[Tuple[bytes, Tuple[str, int], float]] = (
+            deque()
+        )
+        self._queue_nonempty: asyncio.Event = asyncio.Event()
+        # Wall-clock time paired with the loop's monotonic clock, used to
+        # turn the cheap loop.time() receive stamps back into datetimes.
+        self._clock_anchor: Tuple[datetime, float] = (
+            datetime.now(),
+            self.loop.time(),
+        )
 
     @classmethod
-    async def create(cls: Type[Self], host: str, port: int) -> Self:
+    async def create(
+        cls: Type[Self], host: str, port: int, worker_id: int = 0
+    ) -> Self:
         """Creates and initializes the SyslogUDPServer instance."""
-        db_driver = get_db_driver()
+        db_driver = get_db_driver(worker_id)
         server = cls(host, port, db_driver)
         logger.info(f"aiosyslogd starting on UDP {host}:{port}...")
         if server.db:
@@ -117,7 +183,16 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
         """Quickly queue incoming messages without processing."""
         if self._shutting_down:
             return
-        self._message_queue.put_nowait((data, addr, datetime.now()))
+        self._message_queue.append((data, addr, self.loop.time()))
+        self._queue_nonempty.set()
+
+    def _received_at(self, received_mono: float) -> datetime:
+        """Converts a loop.time() receive stamp into a wall-clock datetime."""
+        anchor_wall, anchor_mono = self._clock_anchor
+        if received_mono - anchor_mono >= CLOCK_REANCHOR_INTERVAL:
+            self._clock_anchor = (datetime.now(), self.loop.time())
+            anchor_wall, anchor_mono = self._clock_anchor
+        return anchor_wall + timedelta(seconds=received_mono - anchor_mono)
 
     def error_received(self, exc: Exception) -> None:
         """Handles the error received event."""
@@ -133,15 +208,22 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
     async def database_writer(self) -> None:
         """A dedicated task to write messages to the database in batches."""
         batch: List[Dict[str, Any]] = []
+        queue = self._message_queue
         while not self._shutting_down:
             try:
-                data, addr, received_at = await asyncio.wait_for(
-                    self._message_queue.get(), timeout=BATCH_TIMEOUT
-                )
-                params = self.process_datagram(data, addr, received_at)
-                if params:
-                    batch.append(params)
-                self._message_queue.task_done()
+                if not queue:
+                    self._queue_nonempty.clear()
+                    await asyncio.wait_for(
+                        self._queue_nonempty.wait(), timeout=BATCH_TIMEOUT
+                    )
+                # Drain whatever is already queued in one go.
+                while queue and len(batch) < BATCH_SIZE:
+                    data, addr, received_mono = queue.popleft()
+                    params = self.process_datagram(
+                        data, addr, self._received_at(received_mono)
+                    )
+                    if params:
+                        batch.append(params)
                 if len(batch) >= BATCH_SIZE:
                     if self.db:
                         await self.db.write_batch(batch)
@@ -176,7 +258,11 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
 
         match: re.Match[str] | None = RFC5424_PATTERN.match(processed_data)
         if not match:
-            logger.debug(f"Failed to parse as RFC-5424: {processed_data}")
+            # Guarded so the f-string isn't built per packet when the
+            # logger runs at INFO (the production default). These are the
+            # flags main() lowers the log level to DEBUG or TRACE for.
+            if DEBUG or LOG_DUMP or SQL_DUMP:
+                logger.debug(f"Failed to parse as RFC-5424: {processed_data}")
             pri_end: int = processed_data.find(">")
             code: str = processed_data[1:pri_end] if pri_end != -1 else "14"
             Facility, Priority = self.syslog_matrix.decode_int(code)
@@ -199,9 +285,10 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
         except (ValueError, TypeError):
             device_reported_time = received_at
 
+        facility, priority = self.syslog_matrix.decode_int(parts["pri"])
         return {
-            "Facility": self.syslog_matrix.decode_int(parts["pri"])[0],
-            "Priority": self.syslog_matrix.decode_int(parts["pri"])[1],
+            "Facility": facility,
+            "Priority": priority,
             "FromHost": parts["host"] if parts["host"] != "-" else address[0],
             "InfoUnitID": 1,
             "ReceivedAt": received_at,
@@ -224,18 +311,19 @@ class SyslogUDPServer(asyncio.DatagramProtocol):
             await self.db.close()
 
 
-async def run_server() -> None:
+async def run_server(reuse_port: bool = False, worker_id: int = 0) -> None:
     """Sets up and runs the server until a shutdown signal is received."""
     loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
     server: SyslogUDPServer = await SyslogUDPServer.create(
-        host=BINDING_IP, port=BINDING_PORT
+        host=BINDING_IP, port=BINDING_PORT, worker_id=worker_id
     )
 
     def protocol_factory() -> SyslogUDPServer:
         return server
 
     transport, _ = await loop.create_datagram_endpoint(
-        protocol_factory, local_addr=(server.host, server.port)
+        protocol_factory,
+        sock=create_udp_socket(server.host, server.port, reuse_port),
     )
     logger.info("Server is running. Press Ctrl+C to stop.")
 
@@ -254,8 +342,61 @@ async def run_server() -> None:
         await server.shutdown()
 
 
+def serve(reuse_port: bool = False, worker_id: int = 0) -> None:
+    """Runs one server process until it is told to stop."""
+    try:
+        asyncio.run(run_server(reuse_port, worker_id))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+def run_workers(workers: int) -> None:
+    """Runs several server processes that share the port via SO_REUSEPORT.
+
+    The kernel spreads incoming datagrams across the workers, each of which
+    has its own event loop and database writer. Each worker gets its index
+    as worker_id; only worker 0 runs SQLite retention cleanup.
+    """
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(
+            target=serve, args=(True, i), name=f"aiosyslogd-worker-{i}"
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {workers} worker processes.")
+
+    def terminate_workers(signum: int, frame: Any) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # Workers shut down gracefully on SIGTERM
+
+    signal.signal(signal.SIGTERM, terminate_workers)
+    for process in processes:
+        try:
+            process.join()
+        except KeyboardInterrupt:
+            # Ctrl+C reaches the whole process group; wait for the workers.
+            process.join()
+
+
 def main() -> None:
     """CLI Entry point."""
+    parser = argparse.ArgumentParser(description="aiosyslogd syslog server.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of server processes sharing the UDP port (Linux/macOS).",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("Multiple workers require SO_REUSEPORT support.")
+
     # Set log level to DEBUG if DEBUG or LOG_DUMP is enabled.
     log_level = "DEBUG" if DEBUG or LOG_DUMP else "INFO"
     # If SQL_DUMP is enabled, set log level to TRACE for detailed SQL logging.
@@ -281,9 +422,10 @@ def main() -> None:
 
     logger.info(f"Using {get_event_loop_info()} for the event loop.")
     try:
-        asyncio.run(run_server())
-    except (KeyboardInterrupt, asyncio.CancelledError):
-        pass
+        if args.workers > 1:
+            run_workers(args.workers)
+        else:
+            serve()
     finally:
         logger.info("Server has been shut down.")
 
@@ -5,7 +5,12 @@
 from .config import load_config
 from .auth import AuthManager
 from .db.logs_utils import redact
-from .db.sqlite_utils import get_available_databases, QueryContext, LogQuery
+from .db.sqlite_utils import (
+    get_available_databases,
+    QueryContext,
+    LogQuery,
+    read_pool,
+)
 from datetime import datetime, timedelta
 from functools import wraps
 from loguru import logger
@@ -207,6 +212,12 @@ async def startup() -> None:
     )
 
 
+@app.after_serving
+async def shutdown() -> None:
+    """Closes the pooled read-only database connections."""
+    await read_pool.close()
+
+
 @app.route("/")
 @login_required
 async def index() -> str | Response:
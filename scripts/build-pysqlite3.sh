@@ -0,0 +1,30 @@
+#!/bin/bash
+# Builds pysqlite3 against a SQLite amalgamation compiled with options tuned
+# for syslog ingest and installs it into the Poetry environment.
+# aiosyslogd uses pysqlite3 in place of the stdlib sqlite3 when available.
+
+set -euo pipefail
+
+SQLITE_YEAR="${SQLITE_YEAR:-2025}"
+SQLITE_VERSION="${SQLITE_VERSION:-3500400}"
+PROJECT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+BUILD_DIR="$(mktemp -d)"
+trap 'rm -rf "$BUILD_DIR"' EXIT
+
+cd "$BUILD_DIR"
+curl -fsSLO "https://www.sqlite.org/${SQLITE_YEAR}/sqlite-amalgamation-${SQLITE_VERSION}.zip"
+unzip -q "sqlite-amalgamation-${SQLITE_VERSION}.zip"
+git clone --depth 1 https://github.com/coleifer/pysqlite3.git
+cp "sqlite-amalgamation-${SQLITE_VERSION}"/sqlite3.[ch] pysqlite3/
+
+export CFLAGS="-O3 \
+ -DSQLITE_DEFAULT_WAL_SYNCHRONOUS=1 \
+ -DSQLITE_DEFAULT_MEMSTATUS=0 \
+ -DSQLITE_DEFAULT_AUTOVACUUM=0 \
+ -DSQLITE_LIKE_DOESNT_MATCH_BLOBS \
+ -DSQLITE_ENABLE_BATCH_ATOMIC_WRITE"
+
+cd pysqlite3
+poetry -C "$PROJECT_DIR" run pip install setuptools wheel
+poetry -C "$PROJECT_DIR" run python setup.py build_static bdist_wheel
+poetry -C "$PROJECT_DIR" run pip install --force-reinstall dist/*.whl
@@ -0,0 +1,63 @@
+from aiosyslogd.db import BaseDatabase
+import asyncio
+import pytest
+
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None  # uvloop is an optional for speedup, not a requirement
+
+
+if uvloop is not None:
+
+    def pytest_asyncio_loop_factories(config, item):
+        """Runs async tests on uvloop, the loop main() installs in production."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+class InMemoryStorage:
+    """AuthManager storage backend that keeps users.json in memory."""
+
+    def __init__(self, text=None):
+        self.text = text
+
+    def exists(self):
+        return self.text is not None
+
+    def read(self):
+        return self.text
+
+    def write(self, text):
+        self.text = text
+
+
+@pytest.fixture(scope="module")
+def memory_storage():
+    """An in-memory users store shared by the tests of one module."""
+    return InMemoryStorage()
+
+
+class FakeDatabase(BaseDatabase):
+    """Database driver stand-in that records calls in plain attributes."""
+
+    def __init__(self):
+        self.connected = 0
+        self.closed = 0
+        self.batches = []
+        self.written = asyncio.Event()  # set on every write_batch()
+
+    async def connect(self):
+        self.connected += 1
+
+    async def close(self):
+        self.closed += 1
+
+    async def write_batch(self, batch):
+        self.batches.append(list(batch))
+        self.written.set()
+
+
+@pytest.fixture(scope="module")
+def fake_db():
+    """A recording database driver shared by the tests of one module."""
+    return FakeDatabase()
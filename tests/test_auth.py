@@ -1,16 +1,73 @@
+import copy
+import functools
 import os
 import pytest
 from unittest.mock import patch
-from aiosyslogd.auth import AuthManager, User
+from werkzeug.security import generate_password_hash
+from aiosyslogd.auth import AuthManager, FileStorage, User
+
+FAST_HASH = functools.partial(generate_password_hash, method="pbkdf2:sha256:1")
 
 
 @pytest.fixture
-def auth_manager(tmp_path):
-    users_file = tmp_path / "users.json"
-    return AuthManager(str(users_file))
+def fast_hash(monkeypatch):
+    """Swaps the production KDF for a single-iteration PBKDF2 hash.
+
+    check_password_hash reads the method from the stored hash, so only the
+    generator needs replacing.
+    """
+    monkeypatch.setattr("aiosyslogd.auth.generate_password_hash", FAST_HASH)
+
+
+@pytest.fixture(scope="module")
+def shared_auth_manager(memory_storage):
+    """One AuthManager for the whole module, backed by in-memory storage."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("aiosyslogd.auth.generate_password_hash", FAST_HASH)
+        return AuthManager("users.json", storage=memory_storage)
+
+
+@pytest.fixture
+def auth_manager(shared_auth_manager, fast_hash):
+    """Hands out the shared manager and restores its users after each test.
+
+    Only the users dict is restored; storage is read once at construction,
+    so whatever a test saves there is never seen again.
+    """
+    snapshot = copy.deepcopy(shared_auth_manager.users)
+    yield shared_auth_manager
+    shared_auth_manager.users = snapshot
+
+
+@pytest.fixture(scope="session")
+def default_users_blob(tmp_path_factory):
+    """Bytes of a freshly created default users.json, built once per session."""
+    seed = tmp_path_factory.mktemp("seed") / "users.json"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("aiosyslogd.auth.generate_password_hash", FAST_HASH)
+        AuthManager(str(seed))
+    return seed.read_bytes()
+
+
+@pytest.fixture
+def users_file(tmp_path, default_users_blob):
+    """A users.json on disk seeded from the default blob."""
+    path = tmp_path / "users.json"
+    path.write_bytes(default_users_blob)
+    return path
+
+
+def test_load_existing_users_file(users_file, fast_hash):
+    manager = AuthManager(str(users_file))
+    assert manager.check_password("admin", "admin")
+
+    manager.add_user("testuser", "password123")
+    reloaded = AuthManager(str(users_file))
+    assert reloaded.check_password("testuser", "password123")
 
 
 def test_load_users_creates_default_if_missing(tmp_path):
+    # Deliberately uses the real KDF so the production hashing path stays covered.
     users_file = tmp_path / "users.json"
     assert not os.path.exists(users_file)
 
@@ -22,7 +79,7 @@ def test_load_users_creates_default_if_missing(tmp_path):
     assert manager.check_password("admin", "admin")
 
 
-def test_load_users_handles_json_error(tmp_path):
+def test_load_users_handles_json_error(tmp_path, fast_hash):
     users_file = tmp_path / "users.json"
     with open(users_file, "w") as f:
         f.write("invalid json")
@@ -36,6 +93,21 @@ def test_load_users_handles_json_error(tmp_path):
     assert manager.check_password("admin", "admin")
 
 
+def test_file_storage_uses_utf8(tmp_path):
+    storage = FileStorage(str(tmp_path / "users.json"))
+    storage.write('{"username": "j\u00fcrgen"}')
+
+    assert (tmp_path / "users.json").read_bytes() == (
+        '{"username": "j\u00fcrgen"}'.encode("utf-8")
+    )
+    assert storage.read() == '{"username": "j\u00fcrgen"}'
+
+
+def test_users_saved_to_storage(auth_manager, memory_storage):
+    auth_manager.add_user("testuser", "password123")
+    assert '"testuser"' in memory_storage.read()
+
+
 def test_add_user(auth_manager):
     success, msg = auth_manager.add_user("testuser", "password123")
     assert success
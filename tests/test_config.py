@@ -1,4 +1,4 @@
-from unittest.mock import patch, mock_open, MagicMock
+import io
 import pytest
 import toml
 
@@ -11,127 +11,138 @@ from aiosyslogd.config import (
 # --- Test Suite for config.py ---
 
 
+@pytest.fixture(autouse=True)
+def config_env(monkeypatch):
+    """Fakes the environment; tests set AIOSYSLOGD_CONFIG in the returned dict."""
+    env = {}
+    monkeypatch.setattr(
+        "aiosyslogd.config.os.environ.get", lambda key: env.get(key)
+    )
+    return env
+
+
+class _WriteBuffer(io.StringIO):
+    """StringIO that stores its contents in FakeFiles when closed."""
+
+    def __init__(self, files: "FakeFiles", path: str):
+        super().__init__()
+        self._files = files
+        self._path = path
+
+    def close(self):
+        self._files.contents[self._path] = self.getvalue()
+        super().close()
+
+
+class FakeFiles:
+    """Stands in for open() in aiosyslogd.config, backed by in-memory strings."""
+
+    def __init__(self, contents=None):
+        self.contents = dict(contents or {})
+        self.calls = []  # (path, mode) per open() call
+
+    def __call__(self, path, mode="r"):
+        self.calls.append((path, mode))
+        if "w" in mode:
+            return _WriteBuffer(self, path)
+        if path not in self.contents:
+            raise FileNotFoundError(path)
+        return io.StringIO(self.contents[path])
+
+
+def use_config_files(monkeypatch, contents=None):
+    """Replaces open() in aiosyslogd.config with a FakeFiles and returns it."""
+    files = FakeFiles(contents)
+    monkeypatch.setattr("aiosyslogd.config.open", files, raising=False)
+    return files
+
+
 class TestConfigLoading:
     """Tests for the configuration loading logic in aiosyslogd.config."""
 
-    @patch("aiosyslogd.config.os.environ.get", return_value=None)
-    @patch("aiosyslogd.config.open", new_callable=mock_open)
-    @patch("aiosyslogd.config.toml.dump")
-    def test_create_default_config_when_missing(
-        self, mock_toml_dump, mock_file_open, mock_env_get
-    ):
+    def test_create_default_config_when_missing(self, monkeypatch):
         """
         Tests that a default config file is created if it doesn't exist.
         """
-        # --- Arrange ---
-        # Create a mock file handle that we can reference later.
-        mock_handle = MagicMock()
-
-        # The first call to open() (read mode) will fail.
-        # The second call to open() (write mode) will succeed, returning our pre-made handle.
-        mock_file_open.side_effect = [
-            FileNotFoundError,
-            mock_handle,
-        ]
+        files = use_config_files(monkeypatch)
 
-        # --- Act ---
         loaded_cfg = load_config()
 
-        # --- Assert ---
-        # Verify the sequence of calls to open()
-        assert mock_file_open.call_count == 2
-        mock_file_open.assert_any_call("aiosyslogd.toml", "r")
-        mock_file_open.assert_any_call("aiosyslogd.toml", "w")
-
-        # The 'with' statement calls __enter__ on the mock handle.
-        # So we need to assert against the return value of that.
-        mock_toml_dump.assert_called_once_with(
-            DEFAULT_CONFIG, mock_handle.__enter__()
-        )
-
-        # Verify the loaded config is the default one
+        assert files.calls == [
+            ("aiosyslogd.toml", "r"),
+            ("aiosyslogd.toml", "w"),
+        ]
+        assert toml.loads(files.contents["aiosyslogd.toml"]) == DEFAULT_CONFIG
         assert loaded_cfg == DEFAULT_CONFIG
 
-    @patch("aiosyslogd.config.os.environ.get", return_value=None)
-    def test_load_existing_default_config(self, mock_env_get):
+    @pytest.mark.parametrize(
+        "toml_content, expected",
+        [
+            (
+                '[server]\nbind_ip = "127.0.0.1"\nbind_port = 5141\n',
+                {"server": {"bind_ip": "127.0.0.1", "bind_port": 5141}},
+            ),
+            (
+                '[database]\ndriver = "meilisearch"\n',
+                {"database": {"driver": "meilisearch"}},
+            ),
+        ],
+        ids=["server", "database"],
+    )
+    def test_load_config_from_text(self, toml_content, expected):
         """
-        Tests loading an existing 'aiosyslogd.toml' from the current directory.
+        Tests parsing configuration passed in as a TOML string.
         """
-        # --- Arrange ---
-        mock_toml_content = """
-[server]
-bind_ip = "127.0.0.1"
-bind_port = 5141
-"""
-        # Simulate reading the mock TOML content from the file
-        m = mock_open(read_data=mock_toml_content)
-        with patch("aiosyslogd.config.open", m):
-            # --- Act ---
-            loaded_cfg = load_config()
-
-            # --- Assert ---
-            m.assert_called_once_with("aiosyslogd.toml", "r")
-            assert loaded_cfg["server"]["bind_ip"] == "127.0.0.1"
-            assert loaded_cfg["server"]["bind_port"] == 5141
-
-    @patch(
-        "aiosyslogd.config.os.environ.get",
-        return_value="/etc/custom/config.toml",
-    )
-    def test_load_config_from_env_variable(self, mock_env_get):
+        assert load_config(text=toml_content) == expected
+
+    def test_load_config_from_text_invalid(self):
         """
-        Tests loading a configuration from a path specified in an environment variable.
+        Tests that invalid TOML text exits like an invalid file does.
         """
-        # --- Arrange ---
-        mock_toml_content = """
-[database]
-driver = "meilisearch"
-"""
-        m = mock_open(read_data=mock_toml_content)
-        with patch("aiosyslogd.config.open", m):
-            # --- Act ---
-            loaded_cfg = load_config()
-
-            # --- Assert ---
-            mock_env_get.assert_called_once_with("AIOSYSLOGD_CONFIG")
-            m.assert_called_once_with("/etc/custom/config.toml", "r")
-            assert loaded_cfg["database"]["driver"] == "meilisearch"
-
-    @patch(
-        "aiosyslogd.config.os.environ.get",
-        return_value="/etc/nonexistent/config.toml",
+        with pytest.raises(SystemExit):
+            load_config(text="this is not valid toml")
+
+    @pytest.mark.parametrize(
+        "env_var, expected_path",
+        [
+            (None, "aiosyslogd.toml"),
+            ("/etc/custom/config.toml", "/etc/custom/config.toml"),
+        ],
+        ids=["default_path", "env_variable"],
     )
-    def test_load_missing_custom_config_raises_sysexit(self, mock_env_get):
+    def test_load_existing_config(
+        self, monkeypatch, config_env, env_var, expected_path
+    ):
         """
-        Tests that the program exits if a custom config path is provided but the file is missing.
+        Tests loading an existing config from the default or an env-specified path.
         """
-        # --- Arrange ---
-        m = mock_open()
-        m.side_effect = FileNotFoundError
-        with patch("aiosyslogd.config.open", m):
-            # --- Act & Assert ---
-            with pytest.raises(SystemExit) as e:
-                load_config()
-            # Check that the exit code is non-zero (typically 1)
-            assert e.type is SystemExit
-            assert e.value.code is not None and e.value.code != 0
-
-    @patch("aiosyslogd.config.os.environ.get", return_value=None)
-    def test_load_invalid_toml_raises_sysexit(self, mock_env_get):
+        if env_var:
+            config_env["AIOSYSLOGD_CONFIG"] = env_var
+        files = use_config_files(
+            monkeypatch, {expected_path: "[server]\nbind_port = 5141\n"}
+        )
+
+        assert load_config() == {"server": {"bind_port": 5141}}
+        assert files.calls == [(expected_path, "r")]
+
+    @pytest.mark.parametrize(
+        "env_var, contents",
+        [
+            ("/etc/nonexistent/config.toml", {}),
+            (None, {"aiosyslogd.toml": "this is not valid toml"}),
+        ],
+        ids=["missing_custom_path", "invalid_toml"],
+    )
+    def test_load_config_raises_sysexit(
+        self, monkeypatch, config_env, env_var, contents
+    ):
         """
-        Tests that the program exits if the configuration file contains invalid TOML.
+        Tests that the program exits on a missing custom path or invalid TOML.
         """
-        # --- Arrange ---
-        # Simulate reading a file with invalid content
-        m = mock_open(read_data="this is not valid toml")
-        with patch("aiosyslogd.config.open", m):
-            # Simulate the toml library failing to parse
-            with patch(
-                "aiosyslogd.config.toml.load",
-                side_effect=toml.TomlDecodeError("Invalid TOML", "", 0),
-            ):
-                # --- Act & Assert ---
-                with pytest.raises(SystemExit) as e:
-                    load_config()
-                assert e.type is SystemExit
-                assert e.value.code is not None and e.value.code != 0
+        if env_var:
+            config_env["AIOSYSLOGD_CONFIG"] = env_var
+        use_config_files(monkeypatch, contents)
+
+        with pytest.raises(SystemExit) as e:
+            load_config()
+        assert e.value.code is not None and e.value.code != 0
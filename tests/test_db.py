@@ -2,6 +2,31 @@ from aiosyslogd.db import BaseDatabase
 from typing import Any, Dict, List
 import pytest
 
+# --- Subclasses built once at import; the leading underscore keeps pytest
+# from collecting them. ---
+
+
+class _PartialDatabase(BaseDatabase):
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    # Missing write_batch
+
+
+class _CompleteDatabase(BaseDatabase):
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        pass
+
+
 # --- Test Suite for BaseDatabase ---
 
 
@@ -18,36 +43,15 @@ class TestBaseDatabase:
 
     def test_partial_implementation_fails(self):
         """Tests that a partial implementation missing methods cannot be instantiated."""
-
-        class PartialDatabase(BaseDatabase):
-            async def connect(self) -> None:
-                pass
-
-            async def close(self) -> None:
-                pass
-
-            # Missing write_batch
-
         with pytest.raises(TypeError) as exc_info:
-            PartialDatabase()
-        assert "Can't instantiate abstract class PartialDatabase" in str(
+            _PartialDatabase()
+        assert "Can't instantiate abstract class _PartialDatabase" in str(
             exc_info.value
         )
         assert "write_batch" in str(exc_info.value)
 
     def test_complete_implementation_succeeds(self):
         """Tests that a complete implementation can be instantiated."""
-
-        class CompleteDatabase(BaseDatabase):
-            async def connect(self) -> None:
-                pass
-
-            async def close(self) -> None:
-                pass
-
-            async def write_batch(self, batch: List[Dict[str, Any]]) -> None:
-                pass
-
         # Should not raise any errors
-        instance = CompleteDatabase()
+        instance = _CompleteDatabase()
         assert isinstance(instance, BaseDatabase)
@@ -3,49 +3,50 @@
 Test script to verify the Gemini integration implementation
 """
 
-import sys
-import os
+import asyncio
 import pytest
-
-# Add the project root to the path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pytest_asyncio
 
 from aiosyslogd.web import app
 
 
+@pytest_asyncio.fixture(scope="module")
+async def client():
+    """One test client for the whole module."""
+    async with app.test_client() as test_client:
+        yield test_client
+
+
 @pytest.mark.asyncio
-async def test_routes():
+async def test_routes(client):
     """Test that the new routes exist"""
-    async with app.test_client() as client:
-        # Test that the main page loads
-        response = await client.get("/")
-        assert response.status_code != 404, "Main page should be accessible"
-
-        # Test that the API endpoints exist (will return 302 redirect since not logged in, but shouldn't return 404)
-        response = await client.post(
-            "/api/gemini-search", json={"query": "test"}
-        )
-        assert response.status_code in [
-            401,
-            405,
-            302,
-        ], f"Gemini search endpoint should exist (got {response.status_code})"
-
-        response = await client.post(
-            "/api/save-gemini-key", json={"api_key": "test"}
-        )
-        assert response.status_code in [
-            401,
-            405,
-            302,
-        ], f"Save key endpoint should exist (got {response.status_code})"
-
-        # Test API endpoints
-        response = await client.get("/api/check-gemini-auth")
-        assert response.status_code in [
-            401,
-            405,
-            302,
-        ], f"Auth check endpoint should exist (got {response.status_code})"
-
-        print("✓ All routes exist and are accessible")
+    # The requests are independent, so dispatch them concurrently.
+    main_page, gemini_search, save_key, check_auth = await asyncio.gather(
+        client.get("/"),
+        client.post("/api/gemini-search", json={"query": "test"}),
+        client.post("/api/save-gemini-key", json={"api_key": "test"}),
+        client.get("/api/check-gemini-auth"),
+    )
+
+    # Test that the main page loads
+    assert main_page.status_code != 404, "Main page should be accessible"
+
+    # Test that the API endpoints exist (will return 302 redirect since not logged in, but shouldn't return 404)
+    assert gemini_search.status_code in [
+        401,
+        405,
+        302,
+    ], f"Gemini search endpoint should exist (got {gemini_search.status_code})"
+
+    assert save_key.status_code in [
+        401,
+        405,
+        302,
+    ], f"Save key endpoint should exist (got {save_key.status_code})"
+
+    # Test API endpoints
+    assert check_auth.status_code in [
+        401,
+        405,
+        302,
+    ], f"Auth check endpoint should exist (got {check_auth.status_code})"
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
 import pytest
 
 # --- Import the real MeilisearchDriver from the application source code ---
@@ -12,7 +13,13 @@ from loguru import logger
 
 # --- Import the real MeilisearchDriver from the application source code ---
 # This assumes your project is structured so pytest can find the aiosyslogd package.
-from aiosyslogd.db.meilisearch import MeilisearchDriver
+from aiosyslogd.db.meilisearch import JsonHandler, MeilisearchDriver
+
+# --- Timestamps shared by the tests, built once at import ---
+LOG_TIME_SEPT = datetime(2025, 9, 10, 14, 0, 0)
+LOG_TIME_END_OF_SEPT = datetime(2025, 9, 30, 23, 59, 59)
+LOG_TIME_START_OF_OCT = LOG_TIME_END_OF_SEPT + timedelta(seconds=2)
+LOG_TIME_NOV = datetime(2025, 11, 5, 10, 0, 0)
 
 
 # --- Helper Function for Test Data ---
@@ -31,33 +38,79 @@ def create_log_entry(message: str, timestamp: datetime):
     }
 
 
-# --- Pytest Fixtures ---
-@pytest.fixture
-def mock_client():
-    """
-    A fixture to provide a correctly configured mocked AsyncClient.
-    The key is that client.index() is a regular method that returns a mock Index object,
-    and the Index object's methods are async.
-    """
-    # This is the mock for the Index object. Its methods are async.
-    mock_index_obj = AsyncMock()
-    mock_index_obj.add_documents.return_value = AsyncMock(task_uid=123)
-    mock_index_obj.update_settings.return_value = AsyncMock(task_uid=456)
+# --- Lightweight Fakes ---
+class FakeIndex:
+    """Stand-in for the SDK's AsyncIndex that records calls on its client."""
+
+    def __init__(self, client: "FakeClient", uid: str):
+        self.client = client
+        self.uid = uid
+
+    async def add_documents(self, docs, **_):
+        if self.client.add_documents_error:
+            raise self.client.add_documents_error
+        self.client.adds.append((self.uid, docs))
+        return SimpleNamespace(task_uid=123)
+
+    async def update_settings(self, settings):
+        self.client.settings.append((self.uid, settings))
+        return SimpleNamespace(task_uid=456)
+
 
-    # This is the main client mock.
-    client_mock = AsyncMock()
-    # Configure client.index() to be a regular method that returns our mock_index_obj
-    client_mock.index = MagicMock(return_value=mock_index_obj)
+class FakeClient:
+    """Stand-in for the SDK's AsyncClient with plain lists for assertions."""
 
-    return client_mock
+    def __init__(self):
+        self.created = []  # (uid, primary_key) per create_index call
+        self.adds = []  # (index uid, docs) per add_documents call
+        self.settings = []  # (index uid, settings) per update_settings call
+        self.waited = []  # task uids passed to wait_for_task
+        self.health_status = "available"
+        self.health_error = None
+        self.add_documents_error = None
+        self.wait_error = None
+
+    async def health(self):
+        if self.health_error:
+            raise self.health_error
+        return SimpleNamespace(status=self.health_status)
+
+    async def create_index(self, uid, primary_key=None):
+        self.created.append((uid, primary_key))
+
+    def index(self, uid):
+        return FakeIndex(self, uid)
+
+    async def wait_for_task(self, uid):
+        if self.wait_error:
+            raise self.wait_error
+        self.waited.append(uid)
+        return SimpleNamespace(uid=uid, status="succeeded", error=None)
+
+    async def aclose(self):
+        pass
+
+
+def api_error(message: str) -> MeilisearchApiError:
+    """Builds a MeilisearchApiError for a 500 response."""
+    mock_response = MagicMock()
+    mock_response.status_code = 500
+    return MeilisearchApiError(message, mock_response)
 
 
+# --- Pytest Fixtures ---
 @pytest.fixture
-def driver(mock_client):
-    """Provides an instance of MeilisearchDriver with a mocked client."""
+def fake_client():
+    """Provides a fresh FakeClient for each test."""
+    return FakeClient()
+
+
+@pytest.fixture
+def driver(fake_client):
+    """Provides an instance of MeilisearchDriver with a fake client."""
     # Patch the AsyncClient during instantiation
     with patch(
-        "aiosyslogd.db.meilisearch.AsyncClient", return_value=mock_client
+        "aiosyslogd.db.meilisearch.AsyncClient", return_value=fake_client
     ):
         config = {
             "url": "http://mock-meili:7700",
@@ -68,19 +121,34 @@ def driver(mock_client):
         yield d
 
 
+@pytest.fixture
+def log_sink():
+    """Collects log messages emitted during a test."""
+    messages = []
+    handler_id = logger.add(messages.append)
+    yield messages
+    logger.remove(handler_id)
+
+
 # --- Test Cases ---
 
 
+def test_client_uses_json_handler():
+    """The SDK client is created with the fastest available JSON handler."""
+    with patch("aiosyslogd.db.meilisearch.AsyncClient") as client_cls:
+        MeilisearchDriver({})
+    assert isinstance(client_cls.call_args.kwargs["json_handler"], JsonHandler)
+
+
 @pytest.mark.asyncio
-async def test_write_batch_single_index(driver, mock_client):
+async def test_write_batch_single_index(driver, fake_client):
     """
     Tests that a batch of logs for a single month correctly calls Meilisearch client methods.
     """
     # 1. ARRANGE
-    log_time = datetime(2025, 9, 10, 14, 0, 0)
     log_batch = [
-        create_log_entry("Log entry 1", log_time),
-        create_log_entry("Log entry 2", log_time),
+        create_log_entry("Log entry 1", LOG_TIME_SEPT),
+        create_log_entry("Log entry 2", LOG_TIME_SEPT),
     ]
     expected_index_name = "SystemEvents202509"
 
@@ -89,40 +157,32 @@ async def test_write_batch_single_index(driver, mock_client):
 
     # 3. ASSERT
     # Verify index creation and configuration was attempted
-    mock_client.create_index.assert_called_once_with(
-        uid=expected_index_name, primary_key="id"
-    )
-    mock_client.index.assert_called_with(expected_index_name)
-
-    # Get the mock Index object returned by client.index()
-    mock_index_object = mock_client.index.return_value
-    mock_index_object.update_settings.assert_called_once()
-    mock_client.wait_for_task.assert_any_call(456)  # Settings task
-
-    # Verify documents were added
-    mock_index_object.add_documents.assert_called_once()
-    # Check that the documents passed to the mock have the correct structure and count
-    added_docs = mock_index_object.add_documents.call_args[0][0]
+    assert fake_client.created == [(expected_index_name, "id")]
+    assert [uid for uid, _ in fake_client.settings] == [expected_index_name]
+    assert 456 in fake_client.waited  # Settings task
+
+    # Verify documents were added with the correct structure and count
+    assert len(fake_client.adds) == 1
+    index_uid, added_docs = fake_client.adds[0]
+    assert index_uid == expected_index_name
     assert len(added_docs) == 2
     assert added_docs[0]["Message"] == "Log entry 1"
     assert "id" in added_docs[0]  # Ensure an ID was added
+    assert added_docs[0]["id"] != added_docs[1]["id"]
 
     # Verify the driver waited for the add_documents task to complete
-    mock_client.wait_for_task.assert_any_call(123)  # Document add task
+    assert 123 in fake_client.waited  # Document add task
 
 
 @pytest.mark.asyncio
-async def test_write_batch_across_month_boundary(driver, mock_client):
+async def test_write_batch_across_month_boundary(driver, fake_client):
     """
     Tests that a batch spanning a month boundary correctly creates two indexes and partitions the data.
     """
     # 1. ARRANGE
-    end_of_sept = datetime(2025, 9, 30, 23, 59, 59)
     log_batch = [
-        create_log_entry("Log from September", end_of_sept),
-        create_log_entry(
-            "Log from October", end_of_sept + timedelta(seconds=2)
-        ),  # Crosses into Oct
+        create_log_entry("Log from September", LOG_TIME_END_OF_SEPT),
+        create_log_entry("Log from October", LOG_TIME_START_OF_OCT),
     ]
 
     # 2. ACT
@@ -130,39 +190,30 @@ async def test_write_batch_across_month_boundary(driver, mock_client):
 
     # 3. ASSERT
     # Verify index creation was attempted for both months
-    mock_client.create_index.assert_any_call(
-        uid="SystemEvents202509", primary_key="id"
-    )
-    mock_client.create_index.assert_any_call(
-        uid="SystemEvents202510", primary_key="id"
-    )
-    assert mock_client.create_index.call_count == 2
-
-    # Verify documents were added in two separate calls
-    mock_index_object = mock_client.index.return_value
-    assert mock_index_object.add_documents.call_count == 2
-
-    # Check the contents of each call to add_documents
-    call_args_list = mock_index_object.add_documents.call_args_list
-    sept_call_docs = call_args_list[0].args[0]
-    oct_call_docs = call_args_list[1].args[0]
-
-    assert len(sept_call_docs) == 1
-    assert sept_call_docs[0]["Message"] == "Log from September"
+    assert sorted(fake_client.created) == [
+        ("SystemEvents202509", "id"),
+        ("SystemEvents202510", "id"),
+    ]
 
-    assert len(oct_call_docs) == 1
-    assert oct_call_docs[0]["Message"] == "Log from October"
+    # Verify documents were added in two separate calls, one per index.
+    # The indexes are written concurrently, so the order is not guaranteed.
+    messages_per_index = {
+        uid: [doc["Message"] for doc in docs] for uid, docs in fake_client.adds
+    }
+    assert messages_per_index == {
+        "SystemEvents202509": ["Log from September"],
+        "SystemEvents202510": ["Log from October"],
+    }
 
 
 @pytest.mark.asyncio
-async def test_ensure_index_is_created_only_once(driver, mock_client):
+async def test_ensure_index_is_created_only_once(driver, fake_client):
     """
     Tests that the driver caches index creation status and doesn't try to recreate an index.
     """
     # 1. ARRANGE
-    log_time = datetime(2025, 11, 5, 10, 0, 0)
-    batch1 = [create_log_entry("First batch log", log_time)]
-    batch2 = [create_log_entry("Second batch log", log_time)]
+    batch1 = [create_log_entry("First batch log", LOG_TIME_NOV)]
+    batch2 = [create_log_entry("Second batch log", LOG_TIME_NOV)]
 
     # 2. ACT
     await driver.write_batch(batch1)
@@ -170,107 +221,67 @@ async def test_ensure_index_is_created_only_once(driver, mock_client):
 
     # 3. ASSERT
     # Verify that create_index was only called once for the same index name
-    mock_client.create_index.assert_called_once_with(
-        uid="SystemEvents202511", primary_key="id"
-    )
+    assert fake_client.created == [("SystemEvents202511", "id")]
 
     # Verify that documents were still added twice
-    mock_index_object = mock_client.index.return_value
-    assert mock_index_object.add_documents.call_count == 2
+    assert len(fake_client.adds) == 2
+
+    # Same timestamp in both batches, yet the IDs must not collide
+    ids = [docs[0]["id"] for _, docs in fake_client.adds]
+    assert ids[0] != ids[1]
 
 
 @pytest.mark.asyncio
-async def test_connect_communication_error(mock_client):
-    """Tests that a MeilisearchCommunicationError is raised on connection failure."""
-    # 1. ARRANGE
-    mock_client.health.side_effect = MeilisearchCommunicationError(
-        "Network Error"
-    )
-    config = {
-        "url": "http://mock-meili:7700",
-        "api_key": "mock_key",
-        "debug": True,
-    }
+async def test_doc_ids_unique_across_workers(fake_client):
+    """
+    Tests that --workers processes, each with its own ID sequence, don't
+    produce the same ID for logs received in the same microsecond.
+    """
+    batch = [create_log_entry("Same instant", LOG_TIME_NOV)]
     with patch(
-        "aiosyslogd.db.meilisearch.AsyncClient", return_value=mock_client
+        "aiosyslogd.db.meilisearch.AsyncClient", return_value=fake_client
     ):
-        driver = MeilisearchDriver(config)
+        for worker_id in (0, 1):
+            driver = MeilisearchDriver({"worker_id": worker_id})
+            await driver.write_batch(batch)
+
+    ids = [docs[0]["id"] for _, docs in fake_client.adds]
+    assert ids[0] != ids[1]
+
+
+@pytest.mark.asyncio
+async def test_connect_communication_error(driver, fake_client):
+    """Tests that a MeilisearchCommunicationError is raised on connection failure."""
+    fake_client.health_error = MeilisearchCommunicationError("Network Error")
 
-    # 2. ACT & ASSERT
     with pytest.raises(MeilisearchCommunicationError):
         await driver.connect()
 
 
 @pytest.mark.asyncio
-async def test_connect_unavailable(mock_client):
+async def test_connect_unavailable(driver, fake_client):
     """Tests that a ConnectionError is raised when Meilisearch is not available."""
-    # 1. ARRANGE
-    mock_client.health.return_value = MagicMock(status="unavailable")
-    config = {
-        "url": "http://mock-meili:7700",
-        "api_key": "mock_key",
-        "debug": True,
-    }
-    with patch(
-        "aiosyslogd.db.meilisearch.AsyncClient", return_value=mock_client
-    ):
-        driver = MeilisearchDriver(config)
+    fake_client.health_status = "unavailable"
 
-    # 2. ACT & ASSERT
     with pytest.raises(ConnectionError):
         await driver.connect()
 
 
 @pytest.mark.asyncio
-async def test_write_batch_add_documents_fails(driver, mock_client):
+async def test_write_batch_add_documents_fails(driver, fake_client, log_sink):
     """Tests that an exception during add_documents is handled."""
-    # 1. ARRANGE
-    log_sink = []
-
-    def sink_function(message):
-        log_sink.append(message)
-
-    handler_id = logger.add(sink_function)
+    fake_client.add_documents_error = api_error("API Error")
 
-    log_time = datetime(2025, 9, 10, 14, 0, 0)
-    log_batch = [create_log_entry("Log entry 1", log_time)]
-    mock_index_object = mock_client.index.return_value
-    mock_response = MagicMock()
-    mock_response.status_code = 500
-    mock_index_object.add_documents.side_effect = MeilisearchApiError(
-        "API Error", mock_response
-    )
-
-    # 2. ACT
-    await driver.write_batch(log_batch)
+    await driver.write_batch([create_log_entry("Log entry 1", LOG_TIME_SEPT)])
 
-    # 3. ASSERT
     assert any("Error writing to Meilisearch" in record for record in log_sink)
-    logger.remove(handler_id)
 
 
 @pytest.mark.asyncio
-async def test_write_batch_wait_for_task_fails(driver, mock_client):
+async def test_write_batch_wait_for_task_fails(driver, fake_client, log_sink):
     """Tests that an exception during wait_for_task is handled."""
-    # 1. ARRANGE
-    log_sink = []
-
-    def sink_function(message):
-        log_sink.append(message)
+    fake_client.wait_error = api_error("Task Error")
 
-    handler_id = logger.add(sink_function)
+    await driver.write_batch([create_log_entry("Log entry 1", LOG_TIME_SEPT)])
 
-    log_time = datetime(2025, 9, 10, 14, 0, 0)
-    log_batch = [create_log_entry("Log entry 1", log_time)]
-    mock_response = MagicMock()
-    mock_response.status_code = 500
-    mock_client.wait_for_task.side_effect = MeilisearchApiError(
-        "Task Error", mock_response
-    )
-
-    # 2. ACT
-    await driver.write_batch(log_batch)
-
-    # 3. ASSERT
     assert any("Error writing to Meilisearch" in record for record in log_sink)
-    logger.remove(handler_id)
@@ -3,59 +3,97 @@ from loguru import logger
 from unittest.mock import patch
 import pytest
 import re
-import sys
 
 # --- Import the classes and functions to be tested ---
 from aiosyslogd.priority import SyslogMatrix
 from aiosyslogd.rfc5424 import normalize_to_rfc5424, convert_rfc3164_to_rfc5424
 
 
-@pytest.fixture(autouse=True)
-def setup_logger(capsys):
-    """Ensure logger is configured to output to stderr for capture."""
-    logger.remove()
-    logger.add(sys.stderr, level="DEBUG")
-    yield
+@pytest.fixture(scope="module")
+def log_sink():
+    """Collect DEBUG-level log messages in a list for the whole module."""
+    messages = []
     logger.remove()
+    handler_id = logger.add(messages.append, level="DEBUG")
+    yield messages
+    logger.remove(handler_id)
+
+
+@pytest.fixture(autouse=True)
+def clear_log_sink(log_sink):
+    """Start every test with an empty log sink."""
+    log_sink.clear()
+
+
+@pytest.fixture(scope="session")
+def matrix():
+    """Provide a single SyslogMatrix instance for the whole test session."""
+    return SyslogMatrix()
+
+
+# Expected names are spelled out here rather than read from SyslogMatrix, so
+# the whole precomputed table is checked against an independent source.
+EXPECTED_FACILITIES = (
+    "kernel",
+    "user",
+    "mail",
+    "system",
+    "security0",
+    "syslog",
+    "lpd",
+    "nntp",
+    "uucp",
+    "time",
+    "security1",
+    "ftpd",
+    "ntpd",
+    "logaudit",
+    "logalert",
+    "clock",
+    "local0",
+    "local1",
+    "local2",
+    "local3",
+    "local4",
+    "local5",
+    "local6",
+    "local7",
+)
+EXPECTED_LEVELS = (
+    "emergency",
+    "alert",
+    "critical",
+    "error",
+    "warning",
+    "notice",
+    "info",
+    "debug",
+)
+EXPECTED_DECODE = [
+    (
+        code,
+        (EXPECTED_FACILITIES[code >> 3], code >> 3),
+        (EXPECTED_LEVELS[code & 7], code & 7),
+    )
+    for code in range(192)
+]
 
 
 class TestSyslogMatrix:
     """Tests for the SyslogMatrix priority decoder."""
 
-    @pytest.fixture(scope="class")
-    def matrix(self):
-        """Provide a single SyslogMatrix instance for all tests in this class."""
-        return SyslogMatrix()
-
-    def test_decode_kernel_emergency(self, matrix):
-        """Tests decoding of priority 0 (kernel.emergency)."""
-        facility, level = matrix.decode(0)
-        assert facility == ("kernel", 0)
-        assert level == ("emergency", 0)
-
-    def test_decode_user_notice(self, matrix):
-        """Tests decoding of priority 13 (user.notice)."""
-        facility, level = matrix.decode(13)
-        assert facility == ("user", 1)
-        assert level == ("notice", 5)
-
-    def test_decode_local7_debug(self, matrix):
-        """Tests decoding of the highest priority 191 (local7.debug)."""
-        facility, level = matrix.decode(191)
-        assert facility == ("local7", 23)
-        assert level == ("debug", 7)
-
-    def test_decode_int(self, matrix):
-        """Tests the decode_int method for direct integer output."""
-        facility_int, level_int = matrix.decode_int(13)
-        assert facility_int == 1
-        assert level_int == 5
-
-    def test_decode_invalid_code_fallback(self, matrix):
+    @pytest.mark.parametrize("code, facility, level", EXPECTED_DECODE)
+    def test_decode(self, matrix, code, facility, level):
+        """Tests decoding of every valid priority, as int and as str."""
+        assert matrix.decode(code) == (facility, level)
+        assert matrix.decode(str(code)) == (facility, level)
+        assert matrix.decode_int(code) == (facility[1], level[1])
+
+    @pytest.mark.parametrize("code", [999, 192, -1, "013", "x"])
+    def test_decode_invalid_code_fallback(self, matrix, code):
         """Tests that an invalid code falls back to kernel.emergency."""
-        facility, level = matrix.decode(999)
-        assert facility == ("kernel", 0)
-        assert level == ("emergency", 0)
+        assert matrix.decode(code) == (("kernel", 0), ("emergency", 0))
+        assert matrix.decode_int(code) == (0, 0)
 
 
 class TestRfc5424Conversion:
@@ -99,18 +137,26 @@ class TestRfc5424Conversion:
         normalized = convert_rfc3164_to_rfc5424(rfc3164_msg)
         assert "2024-12-10T" in normalized
 
-    def test_normalize_to_rfc5424_debug_mode(self, capsys):
+    @patch("aiosyslogd.rfc5424.datetime")
+    def test_rfc3164_timestamp_cache_keeps_year(self, mock_datetime):
+        """The same header maps to different years depending on 'now'."""
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+        rfc3164_msg = "<34>Dec 10 22:14:15 mymachine su: test"
+        mock_datetime.now.return_value = datetime(2025, 1, 15)
+        assert "2024-12-10T" in convert_rfc3164_to_rfc5424(rfc3164_msg)
+        mock_datetime.now.return_value = datetime(2025, 12, 31)
+        assert "2025-12-10T" in convert_rfc3164_to_rfc5424(rfc3164_msg)
+
+    def test_normalize_to_rfc5424_debug_mode(self, log_sink):
         message = "this is not a syslog message"
         normalized = normalize_to_rfc5424(message, debug_mode=True)
-        captured = capsys.readouterr()
-        assert "Not an RFC 3164 message" in captured.err
+        assert any("Not an RFC 3164 message" in m for m in log_sink)
         assert normalized == message
 
-    def test_convert_rfc3164_to_rfc5424_timestamp_error(self, capsys):
+    def test_convert_rfc3164_to_rfc5424_timestamp_error(self, log_sink):
         message = "<34>Feb 30 22:14:15 mymachine su: test"  # Invalid date
         normalized = convert_rfc3164_to_rfc5424(message, debug_mode=True)
-        captured = capsys.readouterr()
-        assert "Could not parse RFC-3164 timestamp" in captured.err
+        assert any("Could not parse RFC-3164 timestamp" in m for m in log_sink)
         parts = normalized.split()
         assert parts[0] == "<34>1"
         assert re.match(
@@ -1,6 +1,6 @@
 # tests/test_redaction.py
 import pytest
-from aiosyslogd.db.logs_utils import redact, REDACTION_CHAR
+from aiosyslogd.db.logs_utils import redact, REDACTION_CHAR, REDACTION_PATTERN
 
 # --- Test Suite for the redact() function ---
 
@@ -119,3 +119,19 @@ class TestRedaction:
         log = "Connection from ::ffff:192.168.1.1 was accepted."
         expected = f"Connection from {REDACTION_CHAR * len('::ffff:192.168.1.1')} was accepted."
         assert redact(log) == expected
+
+    @pytest.mark.parametrize(
+        "log",
+        [
+            "Disk usage normal on node seven",
+            "USER root opened a session",
+            "uſer bob opened a session",  # IGNORECASE folds 'ſ' to 's'
+        ],
+    )
+    def test_prefilter_agrees_with_pattern(self, log):
+        """
+        Tests that the substring pre-filter only skips lines the regex
+        would leave unchanged.
+        """
+        has_match = REDACTION_PATTERN.search(log) is not None
+        assert (redact(log) != log) == has_match
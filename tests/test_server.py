@@ -1,158 +1,381 @@
-from aiosyslogd.db import BaseDatabase
-from aiosyslogd.server import SyslogUDPServer, get_db_driver
-from datetime import datetime
+from aiosyslogd.server import (
+    SyslogUDPServer,
+    create_udp_socket,
+    get_db_driver,
+    main,
+    run_workers,
+)
+from datetime import datetime, timedelta
+from functools import cache
 from loguru import logger
-from unittest.mock import AsyncMock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 import asyncio
 import pytest
 import pytest_asyncio
-import sys
+import signal
+import socket
 
 
-@pytest.fixture(autouse=True)
-def setup_logger_for_server(capsys):
-    """Fixture to configure and reset the logger for each test."""
-    logger.remove()
-    logger.add(sys.stderr, level="DEBUG")
-    yield
+@pytest.fixture(scope="module")
+def log_sink():
+    """Collect DEBUG-level log messages in a list for the whole module."""
+    messages = []
     logger.remove()
+    handler_id = logger.add(messages.append, level="DEBUG")
+    yield messages
+    logger.remove(handler_id)
+
+
+@pytest.fixture(autouse=True)
+def clear_log_sink(log_sink):
+    """Start every test with an empty log sink."""
+    log_sink.clear()
 
 
+@cache
 def create_test_datagram(
     message: str, priority: int = 34, ts: str = "2025-06-11T12:00:00.000Z"
 ) -> bytes:
-    """Creates a sample RFC5424 syslog message for testing."""
+    """Creates a sample RFC5424 syslog message, built once per distinct input."""
     return f"<{priority}>1 {ts} testhost testapp 1234 - - {message}".encode(
         "utf-8"
     )
 
 
+# Datagrams for the writer tests, built once at import.
+PAYLOADS = [create_test_datagram(f"log {i}") for i in range(5)]
+
+# connection_made() only stores the transport; shutdown() closes it.
+DUMMY_TRANSPORT = SimpleNamespace(close=lambda: None)
+
+
 @pytest.fixture
-def mock_db():
-    db = AsyncMock(spec=BaseDatabase)
-    db.connect = AsyncMock()
-    db.write_batch = AsyncMock()
-    db.close = AsyncMock()
-    return db
+def debug_on(monkeypatch):
+    """Turns on the server's DEBUG flag for one test."""
+    monkeypatch.setattr("aiosyslogd.server.DEBUG", True)
 
 
-@pytest_asyncio.fixture
-async def server(mock_db):
-    with patch("aiosyslogd.server.get_db_driver", return_value=mock_db):
+@pytest_asyncio.fixture(scope="module")
+async def shared_server(fake_db):
+    """One SyslogUDPServer for the whole module, backed by the fake db."""
+    with patch("aiosyslogd.server.get_db_driver", return_value=fake_db):
         with patch("aiosyslogd.server.BATCH_SIZE", 1):
             server = await SyslogUDPServer.create(host="127.0.0.1", port=5141)
     yield server
-    try:
-        if server._db_writer_task and not server._db_writer_task.done():
-            server._db_writer_task.cancel()
-        await server.shutdown()
-    except asyncio.CancelledError:
-        pass
+    await server.shutdown()
+
+
+@pytest_asyncio.fixture
+async def server(shared_server, fake_db):
+    """Hands out the shared server and resets its writer state afterwards."""
+    yield shared_server
+    task = shared_server._db_writer_task
+    if task:
+        task.cancel()
+        await task  # database_writer returns on cancellation
+        shared_server._db_writer_task = None
+    shared_server._message_queue.clear()
+    shared_server._queue_nonempty.clear()
+    shared_server._shutting_down = False
+    fake_db.batches.clear()
+    fake_db.written.clear()
 
 
 @pytest.mark.asyncio
-async def test_server_creation(server, mock_db):
+async def test_server_creation(server, fake_db):
     assert server.host == "127.0.0.1"
     assert server.port == 5141
-    assert server.db == mock_db
-    assert server._message_queue.empty()
-    mock_db.connect.assert_called_once()
+    assert server.db == fake_db
+    assert not server._message_queue
+    assert fake_db.connected == 1
 
 
 @pytest.mark.asyncio
-async def test_server_creation_debug_mode(mock_db, capsys):
-    with patch("aiosyslogd.server.DEBUG", True):
-        server = await SyslogUDPServer.create(host="127.0.0.1", port=5141)
-        captured = capsys.readouterr()
-        assert "Debug mode is ON." in captured.err
-        try:
-            await server.shutdown()
-        except asyncio.CancelledError:
-            pass
+@pytest.mark.usefixtures("debug_on")
+async def test_server_creation_debug_mode(log_sink):
+    server = await SyslogUDPServer.create(host="127.0.0.1", port=5141)
+    logs = "".join(log_sink)
+    assert "Debug mode is ON." in logs
+    try:
+        await server.shutdown()
+    except asyncio.CancelledError:
+        pass
 
 
 @pytest.mark.asyncio
-async def test_error_received(server, capsys):
+async def test_error_received(server, log_sink):
     test_exc = ValueError("Test Error")
     server.error_received(test_exc)
-    captured = capsys.readouterr()
-    assert "Error received: Test Error" in captured.err
+    logs = "".join(log_sink)
+    assert "Error received: Test Error" in logs
 
 
 @pytest.mark.asyncio
-async def test_connection_lost(server, capsys):
-    test_exc = ConnectionAbortedError("Connection lost unexpectedly")
-    server.connection_lost(test_exc)
-    captured = capsys.readouterr()
-    assert "Connection lost: Connection lost unexpectedly" in captured.err
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (
+            ConnectionAbortedError("Connection lost unexpectedly"),
+            "Connection lost: Connection lost unexpectedly",
+        ),
+        (None, "Connection closed normally."),
+    ],
+    ids=["error", "normal"],
+)
+async def test_connection_lost(server, log_sink, exc, expected):
+    server.connection_lost(exc)
+    logs = "".join(log_sink)
+    assert expected in logs
 
 
 @pytest.mark.asyncio
-async def test_database_writer_exception(server, mock_db, capsys):
-    server.connection_made(MagicMock())
-    with patch.object(
-        server, "process_datagram", side_effect=ValueError("Processing failed")
-    ):
+async def test_database_writer_exception(server, fake_db, log_sink):
+    processed = asyncio.Event()
+
+    def fail_processing(*args):
+        processed.set()
+        raise ValueError("Processing failed")
+
+    server.connection_made(DUMMY_TRANSPORT)
+    with patch.object(server, "process_datagram", side_effect=fail_processing):
         server.datagram_received(
             create_test_datagram("bad log"), ("localhost", 123)
         )
-        await asyncio.sleep(0.01)
-        captured = capsys.readouterr()
-        assert "Error in database writer" in captured.err
-        assert "Processing failed" in captured.err
-        mock_db.write_batch.assert_not_called()
+        await asyncio.wait_for(processed.wait(), timeout=1.0)
+        logs = "".join(log_sink)
+        assert "Error in database writer" in logs
+        assert "Processing failed" in logs
+        assert fake_db.batches == []
+
+
+@pytest.mark.asyncio
+async def test_database_writer_drains_queued_datagrams(server, fake_db):
+    # Queue everything before the writer starts, so it drains in one turn.
+    for payload in PAYLOADS:
+        server.datagram_received(payload, ("localhost", 123))
+    with patch("aiosyslogd.server.BATCH_SIZE", 3):
+        server.connection_made(DUMMY_TRANSPORT)
+        await asyncio.wait_for(fake_db.written.wait(), timeout=1.0)
+    assert [len(batch) for batch in fake_db.batches] == [3]
+    assert not server._message_queue
+
+
+@pytest.mark.asyncio
+async def test_database_writer_flushes_on_timeout(server, fake_db):
+    # A partial batch goes out once BATCH_TIMEOUT passes without traffic.
+    with (
+        patch("aiosyslogd.server.BATCH_SIZE", 100),
+        patch("aiosyslogd.server.BATCH_TIMEOUT", 0),
+    ):
+        server.connection_made(DUMMY_TRANSPORT)
+        server.datagram_received(
+            create_test_datagram("lonely log"), ("localhost", 123)
+        )
+        await asyncio.wait_for(fake_db.written.wait(), timeout=1.0)
+    assert [len(batch) for batch in fake_db.batches] == [1]
 
 
 @pytest.mark.asyncio
-async def test_process_datagram_log_dump_on(server, capsys):
+async def test_process_datagram_log_dump_on(server, log_sink):
     test_data = create_test_datagram("Log dump test")
     addr = ("192.168.1.1", 12345)
     with patch("aiosyslogd.server.LOG_DUMP", True):
         server.process_datagram(test_data, addr, datetime.now())
-        captured = capsys.readouterr()
-        assert "FROM 192.168.1.1:" in captured.err
-        assert "Log dump test" in captured.err
+        logs = "".join(log_sink)
+        assert "FROM 192.168.1.1:" in logs
+        assert "Log dump test" in logs
+
+
+@pytest.mark.asyncio
+async def test_process_datagram_invalid_timestamp_fallback(server):
+    test_data = create_test_datagram("Bad timestamp", ts="not-a-timestamp")
+    received_at = datetime(2025, 6, 11, 12, 0, 0)
+    params = server.process_datagram(
+        test_data, ("192.168.1.1", 12345), received_at
+    )
+    assert params["DeviceReportedTime"] == received_at
+    assert params["Message"] == "Bad timestamp"
 
 
 @pytest.mark.asyncio
-async def test_process_datagram_invalid_encoding(server, capsys):
+async def test_process_datagram_invalid_encoding(server, log_sink):
     test_data = b"\xff\xfe"
     addr = ("192.168.1.1", 12345)
     params = server.process_datagram(test_data, addr, datetime.now())
-    captured = capsys.readouterr()
+    logs = "".join(log_sink)
     assert params is None
-    assert "Cannot decode message" in captured.err
+    assert "Cannot decode message from 192.168.1.1" in logs
 
 
 @pytest.mark.asyncio
-async def test_debug_mode_invalid_datagram(server, capsys):
-    with patch("aiosyslogd.server.DEBUG", True):
-        test_data = b"this is not a syslog message"
-        addr = ("192.168.1.1", 12345)
-        params = server.process_datagram(test_data, addr, datetime.now())
-        captured = capsys.readouterr()
-        assert (
-            "Failed to parse as RFC-5424: this is not a syslog message"
-            in captured.err
-        )
-        assert params is not None
-        assert params["Message"] == "this is not a syslog message"
+@pytest.mark.parametrize("flag", ["DEBUG", "LOG_DUMP", "SQL_DUMP"])
+async def test_debug_mode_invalid_datagram(
+    server, log_sink, monkeypatch, flag
+):
+    monkeypatch.setattr(f"aiosyslogd.server.{flag}", True)
+    test_data = b"this is not a syslog message"
+    addr = ("192.168.1.1", 12345)
+    params = server.process_datagram(test_data, addr, datetime.now())
+    logs = "".join(log_sink)
+    assert "Failed to parse as RFC-5424: this is not a syslog message" in logs
+    assert params is not None
+    assert params["Message"] == "this is not a syslog message"
 
 
-def test_get_db_driver_injection_attempt(capsys):
+@pytest.mark.asyncio
+async def test_received_at_uses_loop_clock(server):
+    now = datetime.now()
+    received_at = server._received_at(server.loop.time())
+    assert abs(received_at - now) < timedelta(seconds=1)
+
+
+@pytest.mark.asyncio
+async def test_received_at_reanchors_stale_clock(server):
+    stale_wall = datetime(2020, 1, 1)
+    server._clock_anchor = (stale_wall, server.loop.time() - 120)
+    received_at = server._received_at(server.loop.time())
+    assert server._clock_anchor[0] > stale_wall
+    assert abs(received_at - datetime.now()) < timedelta(seconds=1)
+
+
+def test_get_db_driver_passes_worker_id():
+    with patch("aiosyslogd.server.DB_DRIVER", "sqlite"):
+        assert get_db_driver(worker_id=2).worker_id == 2
+
+
+def test_get_db_driver_injection_attempt(log_sink):
     malicious_driver_name = "../../../../os"
     with patch("aiosyslogd.server.DB_DRIVER", malicious_driver_name):
         with pytest.raises(SystemExit):
             get_db_driver()
-    captured = capsys.readouterr()
-    assert "Invalid database driver" in captured.err
-    assert f"'{malicious_driver_name}'" in captured.err
+    logs = "".join(log_sink)
+    assert "Invalid database driver" in logs
+    assert f"'{malicious_driver_name}'" in logs
 
 
-@pytest.mark.asyncio
-async def test_process_datagram_invalid_encoding_logs_address(server, capsys):
-    test_data = b"\xff\xfe"
-    addr = ("192.168.1.1", 12345)
-    server.process_datagram(test_data, addr, datetime.now())
-    captured = capsys.readouterr()
-    assert "Cannot decode message from 192.168.1.1" in captured.err
+def test_create_udp_socket_sets_receive_buffer():
+    with patch("aiosyslogd.server.RECV_BUFFER_SIZE", 65536):
+        sock = create_udp_socket("127.0.0.1", 0)
+    try:
+        assert sock.type == socket.SOCK_DGRAM
+        assert sock.getblocking() is False
+        assert sock.getsockname()[1] > 0
+        # Linux reports double the requested size to account for overhead.
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 65536
+    finally:
+        sock.close()
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"), reason="requires SO_REUSEPORT"
+)
+def test_create_udp_socket_reuse_port():
+    first = create_udp_socket("127.0.0.1", 0, reuse_port=True)
+    try:
+        port = first.getsockname()[1]
+        second = create_udp_socket("127.0.0.1", port, reuse_port=True)
+        second.close()
+    finally:
+        first.close()
+
+
+class FakeProcess:
+    """Stands in for a forked worker process in run_workers()."""
+
+    def __init__(self, target, args, name):
+        self.target = target
+        self.args = args
+        self.name = name
+        self.started = False
+        self.joins = 0
+        self.terminated = False
+        self.interrupt_first_join = False
+
+    def start(self):
+        self.started = True
+
+    def join(self):
+        self.joins += 1
+        if self.interrupt_first_join and self.joins == 1:
+            raise KeyboardInterrupt
+
+    def is_alive(self):
+        return not self.terminated
+
+    def terminate(self):
+        self.terminated = True
+
+
+def test_run_workers_starts_and_stops_workers():
+    processes = []
+
+    def make_process(target, args, name):
+        processes.append(FakeProcess(target, args, name))
+        processes[-1].interrupt_first_join = len(processes) == 1
+        return processes[-1]
+
+    ctx = SimpleNamespace(Process=make_process)
+    with (
+        patch(
+            "aiosyslogd.server.multiprocessing.get_context", return_value=ctx
+        ),
+        patch("aiosyslogd.server.signal.signal") as set_handler,
+    ):
+        run_workers(3)
+
+    assert [p.args for p in processes] == [(True, 0), (True, 1), (True, 2)]
+    assert all(p.started for p in processes)
+    # Ctrl+C during the first join still waits for that worker.
+    assert [p.joins for p in processes] == [2, 1, 1]
+
+    signum, terminate_workers = set_handler.call_args.args
+    assert signum == signal.SIGTERM
+    processes[1].terminated = True  # Already exited
+    terminate_workers(signum, None)
+    assert all(p.terminated for p in processes)
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """Runs main() with the given CLI args, without starting any server."""
+    serve = MagicMock()
+    workers = MagicMock()
+    monkeypatch.setattr("aiosyslogd.server.serve", serve)
+    monkeypatch.setattr("aiosyslogd.server.run_workers", workers)
+    # main() reconfigures loguru; keep the module's log_sink installed.
+    monkeypatch.setattr("aiosyslogd.server.logger", MagicMock())
+    monkeypatch.setattr("aiosyslogd.server.uvloop", None)
+
+    def run(*args):
+        monkeypatch.setattr("sys.argv", ["aiosyslogd", *args])
+        main()
+        return serve, workers
+
+    return run
+
+
+def test_main_defaults_to_single_process(run_main):
+    serve, workers = run_main()
+    serve.assert_called_once_with()
+    workers.assert_not_called()
+
+
+def test_main_runs_workers(run_main):
+    serve, workers = run_main("--workers", "4")
+    workers.assert_called_once_with(4)
+    serve.assert_not_called()
+
+
+@pytest.mark.parametrize("value", ["0", "-2"])
+def test_main_rejects_non_positive_workers(run_main, capsys, value):
+    with pytest.raises(SystemExit) as e:
+        run_main("--workers", value)
+    assert e.value.code == 2
+    assert "--workers must be at least 1" in capsys.readouterr().err
+
+
+def test_main_workers_require_reuse_port(run_main, monkeypatch):
+    monkeypatch.setattr("aiosyslogd.server.socket", SimpleNamespace())
+    with pytest.raises(SystemExit, match="SO_REUSEPORT"):
+        run_main("--workers", "2")
@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any
 import aiosqlite
+import asyncio
+import multiprocessing
 import os
 import pytest
 import pytest_asyncio
 import sqlite3
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from loguru import logger
 import sys
 
@@ -45,6 +47,11 @@ def create_log_entry(message: str, timestamp: datetime) -> Dict[str, Any]:
     }
 
 
+async def query_driver(driver: SQLiteDriver, sql: str) -> list:
+    """Runs a query on the driver's own connection, on its writer thread."""
+    return await driver._run(lambda: driver.db.execute(sql).fetchall())
+
+
 # --- Pytest Fixtures ---
 @pytest.fixture
 def tmp_db_path(tmp_path):
@@ -84,15 +91,8 @@ async def test_write_batch_single_month_fast_path(driver, tmp_db_path):
     db_path = tmp_db_path.parent / db_filename
     assert os.path.exists(db_path), "Database file was not created for July"
 
-    conn = await aiosqlite.connect(
-        db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-    )
-    async with conn.cursor() as cursor:
-        await cursor.execute("SELECT COUNT(*) FROM SystemEvents")
-        count = await cursor.fetchone()
-    await conn.close()
-
-    assert count[0] == 2, "Should have written exactly 2 logs"
+    count = await query_driver(driver, "SELECT COUNT(*) FROM SystemEvents")
+    assert count == [(2,)], "Should have written exactly 2 logs"
 
 
 @pytest.mark.asyncio
@@ -177,23 +177,22 @@ async def test_fts_search_functionality(driver, tmp_db_path):
     await driver.write_batch(log_batch)
 
     # 3. ASSERT
-    conn = await aiosqlite.connect(
-        db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+    assert driver._current_db_path == str(db_path)
+    assert await query_driver(driver, "PRAGMA journal_mode") == [("wal",)]
+    assert await query_driver(driver, "PRAGMA synchronous") == [(1,)]  # NORMAL
+    assert await query_driver(driver, "PRAGMA busy_timeout") == [(10000,)]
+
+    # Search for a specific word
+    failure_logs = await query_driver(
+        driver,
+        "SELECT Message FROM SystemEvents_FTS WHERE Message MATCH 'failure'",
     )
-    async with conn.cursor() as cursor:
-        # Search for a specific word
-        await cursor.execute(
-            "SELECT Message FROM SystemEvents_FTS WHERE Message MATCH 'failure'"
-        )
-        failure_logs = await cursor.fetchall()
 
-        # Search using a prefix
-        await cursor.execute(
-            "SELECT Message FROM SystemEvents_FTS WHERE Message MATCH 'succ*'"
-        )
-        success_logs = await cursor.fetchall()
-
-    await conn.close()
+    # Search using a prefix
+    success_logs = await query_driver(
+        driver,
+        "SELECT Message FROM SystemEvents_FTS WHERE Message MATCH 'succ*'",
+    )
 
     assert len(failure_logs) == 1, "Should find exactly one log with 'failure'"
     assert failure_logs[0][0] == "This is a critical failure message"
@@ -223,9 +222,26 @@ async def test_write_empty_batch(driver, tmp_db_path):
     ), "No database files should be created for an empty batch"
 
 
+@pytest.mark.asyncio
+async def test_close_shuts_down_writer_thread(driver):
+    """Tests that close() stops the writer thread after the last close."""
+    await driver.write_batch(
+        [create_log_entry("last log", datetime(2025, 5, 1))]
+    )
+    writer_threads = list(driver._writer._threads)
+    assert writer_threads
+
+    await driver.close()
+
+    assert driver.db is None
+    assert not any(t.is_alive() for t in writer_threads)
+    with pytest.raises(RuntimeError):
+        driver._writer.submit(lambda: None)
+
+
 @pytest.mark.asyncio
 async def test_write_batch_sqlite_error(driver):
-    """Tests that an aiosqlite.Error during a batch write is correctly handled."""
+    """Tests that a sqlite3.Error during a batch write is correctly handled."""
     # 1. ARRANGE
     log_sink = []
 
@@ -240,15 +256,105 @@ async def test_write_batch_sqlite_error(driver):
 
     # 2. ACT & ASSERT
     with patch.object(driver, "_switch_db_if_needed", new=AsyncMock()):
-        with patch.object(driver, "db", new_callable=AsyncMock) as mock_db:
-            mock_db.executemany.side_effect = aiosqlite.Error("Test Error")
+        with patch.object(driver, "db", new_callable=MagicMock) as mock_db:
+            mock_db.executemany.side_effect = sqlite3.Error("Test Error")
             await driver._write_sub_batch(log_batch)
 
             # 3. ASSERT
             assert any(
                 "Batch SQL write failed" in record for record in log_sink
             )
+            mock_db.rollback.assert_called_once()
 
     # Cleanup
     logger.remove(handler_id)
     logger.add(sys.stderr)
+
+
+class OptimizeFailsConnection(sqlite3.Connection):
+    """A connection whose PRAGMA optimize fails, as if the file were busy."""
+
+    def execute(self, sql, *args):
+        if sql.startswith("PRAGMA optimize"):
+            raise sqlite3.OperationalError("database is locked")
+        return super().execute(sql, *args)
+
+
+@pytest.mark.asyncio
+async def test_close_survives_failed_optimize(driver, tmp_db_path):
+    """
+    Tests that a failing PRAGMA optimize still closes the connection, so the
+    driver can switch months and shut down afterwards.
+    """
+    messages = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    real_connect = sqlite3.connect
+    with patch(
+        "aiosyslogd.db.sqlite.sqlite3.connect",
+        side_effect=lambda path: real_connect(
+            path, factory=OptimizeFailsConnection
+        ),
+    ):
+        await driver.write_batch(
+            [create_log_entry("May log", datetime(2025, 5, 31, 23, 59))]
+        )
+        may_db = driver.db
+        await driver.write_batch(
+            [create_log_entry("June log", datetime(2025, 6, 1, 0, 1))]
+        )
+        assert driver._current_db_path.endswith("_202506.sqlite3")
+        assert await query_driver(
+            driver, "SELECT Message FROM SystemEvents"
+        ) == [("June log",)]
+        # The May connection was closed despite the failed optimize.
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            await driver._run(may_db.execute, "SELECT 1")
+        await driver.close()
+    logger.remove(handler_id)
+
+    assert driver.db is None and driver._current_db_path is None
+    assert sum("PRAGMA optimize failed" in m for m in messages) == 2
+
+
+def _write_from_worker(db_path: str, barrier, worker_id: int) -> None:
+    """Writes one log to a fresh month's file from a forked worker."""
+
+    async def write() -> None:
+        d = SQLiteDriver({"database": db_path, "worker_id": worker_id})
+        barrier.wait()
+        await d.write_batch(
+            [create_log_entry(f"worker {worker_id}", datetime(2025, 3, 1))]
+        )
+        await d.close()
+
+    asyncio.run(write())
+
+
+def test_workers_create_monthly_tables_concurrently(tmp_db_path):
+    """
+    Tests that --workers processes opening a new month's file at the same
+    moment all create the schema without losing a batch.
+    """
+    workers = 4
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(workers)
+    processes = [
+        ctx.Process(
+            target=_write_from_worker, args=(str(tmp_db_path), barrier, i)
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    db = sqlite3.connect(tmp_db_path.parent / "test_syslog_202503.sqlite3")
+    messages = db.execute("SELECT Message FROM SystemEvents").fetchall()
+    fts_rows = db.execute(
+        "SELECT COUNT(*) FROM SystemEvents_FTS WHERE Message MATCH 'worker'"
+    ).fetchone()[0]
+    db.close()
+    assert sorted(messages) == [(f"worker {i}",) for i in range(workers)]
+    assert fts_rows == workers
@@ -128,6 +128,21 @@ class TestSQLiteCleanup:
 
         assert not os.path.exists(old_path)
 
+    @pytest.mark.asyncio
+    async def test_cleanup_only_on_worker_zero(
+        self, sqlite_driver, temp_db_dir
+    ):
+        """Test that other --workers processes leave cleanup to worker 0."""
+        sqlite_driver.retention_months = 0
+        sqlite_driver.worker_id = 1
+        old_path = os.path.join(temp_db_dir, "test_syslog_202501.sqlite3")
+        with open(old_path, "w") as f:
+            f.write("test")
+
+        await sqlite_driver.cleanup_old_databases()
+
+        assert os.path.exists(old_path)
+
     @pytest.mark.asyncio
     async def test_close_handles_no_active_connection(self, sqlite_driver):
         """Test that close() works even when there's no active connection."""
@@ -1,3 +1,4 @@
+from loguru import logger
 from unittest.mock import patch, AsyncMock, MagicMock
 import aiosqlite
 import pytest
@@ -7,6 +8,7 @@ import sys
 # --- Import the module and app to be tested ---
 from aiosyslogd import web
 from aiosyslogd.db import sqlite_utils
+from aiosyslogd.db.sqlite import SQLiteDriver
 
 
 @pytest.fixture
@@ -93,6 +95,7 @@ async def test_get_available_databases(mock_glob):
     ]
     # Mock the configuration to provide the base path for the search pattern
     mock_config = {"database": {"sqlite": {"database": "syslog.sqlite3"}}}
+    sqlite_utils._get_available_databases_cached.cache_clear()
 
     # --- Act ---
     with patch("aiosyslogd.web.CFG", mock_config):
@@ -110,6 +113,28 @@ async def test_get_available_databases(mock_glob):
     assert available_dbs == expected_order
 
 
+@pytest.mark.asyncio
+@patch("aiosyslogd.db.sqlite_utils.glob")
+async def test_get_available_databases_cached_on_dir_mtime(mock_glob):
+    """
+    Tests that the file listing is reused until the directory mtime changes.
+    """
+    mock_glob.glob.return_value = ["syslog_202506.sqlite3"]
+    mock_config = {"database": {"sqlite": {"database": "syslog.sqlite3"}}}
+    sqlite_utils._get_available_databases_cached.cache_clear()
+
+    with patch("aiosyslogd.db.sqlite_utils._dir_stamp", return_value=1):
+        await sqlite_utils.get_available_databases(mock_config)
+        available_dbs = await sqlite_utils.get_available_databases(mock_config)
+    assert available_dbs == ["syslog_202506.sqlite3"]
+    mock_glob.glob.assert_called_once()
+
+    mock_glob.glob.return_value.append("syslog_202507.sqlite3")
+    with patch("aiosyslogd.db.sqlite_utils._dir_stamp", return_value=2):
+        available_dbs = await sqlite_utils.get_available_databases(mock_config)
+    assert available_dbs == ["syslog_202507.sqlite3", "syslog_202506.sqlite3"]
+
+
 @pytest.mark.asyncio
 async def test_get_time_boundary_ids():
     """
@@ -220,6 +245,26 @@ def test_build_log_query_all_filters():
     assert expected_count_sql == result["count_sql"]
     assert expected_count_params == result["count_params"]
 
+    # --- Assert query plans against the driver's real schema ---
+    db = sqlite3.connect(":memory:")
+    SQLiteDriver({})._create_tables(db, "SystemEvents")
+    for sql, params in [
+        (result["main_sql"], result["main_params"]),
+        (result["count_sql"], result["count_params"]),
+    ]:
+        plan = [
+            row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        ]
+        # The host filter and ID range seek the FromHost index...
+        assert any(
+            d.startswith("SEARCH") and "idx_SystemEvents_FromHost" in d
+            for d in plan
+        ), plan
+        # ...and MATCH runs once, as a list subquery on the FTS index.
+        assert "LIST SUBQUERY 1" in plan, plan
+        assert any("VIRTUAL TABLE INDEX 0:M" in d for d in plan), plan
+    db.close()
+
 
 @patch("aiosyslogd.web.app.run")
 @patch("aiosyslogd.web.uvloop", create=True)
@@ -263,6 +308,13 @@ class TestLogQuery:
             mock_loguru_logger.opt.return_value = mock_loguru_logger
             yield mock_loguru_logger
 
+    @pytest.fixture(autouse=True)
+    def read_pool(self):
+        """Gives each test an empty read connection pool."""
+        pool = sqlite_utils.ReadOnlyConnectionPool()
+        with patch("aiosyslogd.db.sqlite_utils.read_pool", pool):
+            yield pool
+
     def test_log_query_initialization(self):
         """
         Tests that the LogQuery class initializes correctly and sets the
@@ -316,10 +368,16 @@ class TestLogQuery:
         )
 
         # --- Act ---
-        query_approx = sqlite_utils.LogQuery(ctx_approx)
-        query_no_approx_search = sqlite_utils.LogQuery(ctx_no_approx_search)
-        query_no_approx_host = sqlite_utils.LogQuery(ctx_no_approx_host)
-        query_no_approx_no_time = sqlite_utils.LogQuery(ctx_no_approx_no_time)
+        query_approx = sqlite_utils.LogQuery(ctx_approx, logger)
+        query_no_approx_search = sqlite_utils.LogQuery(
+            ctx_no_approx_search, logger
+        )
+        query_no_approx_host = sqlite_utils.LogQuery(
+            ctx_no_approx_host, logger
+        )
+        query_no_approx_no_time = sqlite_utils.LogQuery(
+            ctx_no_approx_no_time, logger
+        )
 
         # --- Assert ---
         assert query_approx.use_approximate_count is True
@@ -365,19 +423,15 @@ class TestLogQuery:
         # THIS IS THE KEY: .execute must be a SYNC function that RETURNS the async context manager
         mock_conn.execute = MagicMock(return_value=mock_execute_cm)
 
-        # 4. Mock the async context manager that `aiosqlite.connect` returns
-        mock_connect_cm = AsyncMock()
-        mock_connect_cm.__aenter__.return_value = mock_conn
-
         # --- Act ---
-        # Patch aiosqlite.connect to be a function that returns our connect context manager
+        # Patch aiosqlite.connect; awaiting its result yields our connection
         with patch(
-            "aiosqlite.connect", return_value=mock_connect_cm
+            "aiosqlite.connect", new_callable=AsyncMock, return_value=mock_conn
         ) as mock_connect_func:
             with patch(
                 "aiosyslogd.db.sqlite_utils.get_time_boundary_ids"
             ) as mock_get_bounds:
-                log_query = sqlite_utils.LogQuery(ctx)
+                log_query = sqlite_utils.LogQuery(ctx, logger)
                 results = await log_query.run()
 
         # --- Assert ---
@@ -399,8 +453,42 @@ class TestLogQuery:
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
         )
 
-        # Verify that execute was called twice (once for count, once for logs)
-        assert mock_conn.execute.call_count == 2
+        # Verify that execute was called three times (mmap_size PRAGMA on
+        # the new pooled connection, then once for count, once for logs)
+        assert mock_conn.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_read_pool_reuses_connections(self, read_pool, tmp_path):
+        """
+        Tests that the pool hands back idle connections per database file,
+        closes the least recently used beyond max_idle, and drops
+        connections whose query failed.
+        """
+        paths = [str(tmp_path / f"syslog_20250{m}.sqlite3") for m in (5, 6)]
+        for path in paths:
+            sqlite3.connect(path).close()
+        read_pool.max_idle = 1
+
+        try:
+            async with read_pool.acquire(paths[0]) as first:
+                async with first.execute("PRAGMA mmap_size") as cursor:
+                    assert (await cursor.fetchone())[0] == read_pool.mmap_size
+            async with read_pool.acquire(paths[0]) as again:
+                assert again is first
+            async with read_pool.acquire(paths[1]) as other:
+                assert other is not first
+            # Returning `other` pushed `first` out of the pool.
+            async with read_pool.acquire(paths[0]) as reopened:
+                assert reopened is not first
+
+            with pytest.raises(aiosqlite.OperationalError):
+                async with read_pool.acquire(paths[0]) as conn:
+                    assert conn is reopened
+                    await conn.execute("SELECT * FROM missing_table")
+            async with read_pool.acquire(paths[0]) as conn:
+                assert conn is not reopened
+        finally:
+            await read_pool.close()
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
@@ -426,7 +514,7 @@ class TestLogQuery:
             "aiosqlite.connect", side_effect=error_to_raise(error_message)
         ) as mock_connect:
             # --- Act ---
-            log_query = sqlite_utils.LogQuery(ctx)
+            log_query = sqlite_utils.LogQuery(ctx, logger)
             results = await log_query.run()
 
         # --- Assert ---
@@ -453,7 +541,7 @@ class TestLogQuery:
             direction="next",
             page_size=50,
         )
-        log_query = sqlite_utils.LogQuery(ctx)
+        log_query = sqlite_utils.LogQuery(ctx, logger)
         log_query.conn = AsyncMock()  # Mock the connection attribute
 
         mock_return_value = (100, 200, ["Debug info for boundaries"])
@@ -501,7 +589,7 @@ class TestLogQuery:
             direction="next",
             page_size=50,
         )
-        log_query = sqlite_utils.LogQuery(ctx)
+        log_query = sqlite_utils.LogQuery(ctx, logger)
         log_query.use_approximate_count = use_approx
         log_query.start_id = start_id
         log_query.end_id = end_id
@@ -565,7 +653,7 @@ class TestLogQuery:
             direction="next",
             page_size=50,
         )
-        log_query = sqlite_utils.LogQuery(ctx)
+        log_query = sqlite_utils.LogQuery(ctx, logger)
         log_query.use_approximate_count = use_approx
         log_query.start_id = start_id
         log_query.end_id = end_id
@@ -619,13 +707,9 @@ class TestLogQuery:
         mock_conn = AsyncMock()
         mock_conn.execute = MagicMock()  # Should not be called
 
-        # Mock the async context manager that `aiosqlite.connect` returns
-        mock_connect_cm = AsyncMock()
-        mock_connect_cm.__aenter__.return_value = mock_conn
-
         # Patch aiosqlite.connect and the boundary function
         with patch(
-            "aiosqlite.connect", return_value=mock_connect_cm
+            "aiosqlite.connect", new_callable=AsyncMock, return_value=mock_conn
         ) as mock_connect_func:
             with patch(
                 "aiosyslogd.db.sqlite_utils.get_time_boundary_ids",
@@ -703,7 +787,7 @@ class TestLogQuery:
             direction=direction,
             page_size=50,
         )
-        log_query = sqlite_utils.LogQuery(ctx)
+        log_query = sqlite_utils.LogQuery(ctx, logger)
         # Use a copy of the list to prevent mutation issues.
         log_query.results["logs"] = input_logs.copy()
 